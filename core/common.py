@@ -2,27 +2,80 @@ import os
 
 from PyQt5.QtCore import QObject, pyqtSignal, QRunnable
 
+SUPPORTED_IMAGES=('.jpg', '.jpeg', '.png')
+SUPPORTED_VIDEOS=('.mp4', '.mov', '.avi', '.mkv')
 THUMBNAIL_DELAY=111
+# Unter Last wird der Animationstakt bis auf dieses Vielfache gestreckt
+ANIMATION_MAX_SLOWDOWN=4
+# Pünktliche Ticks, bevor der Takt wieder beschleunigt wird
+ANIMATION_RECOVER_TICKS=20
+# Abstand zwischen den Zellen im Vorschau-Grid und vorgeladene Zeilen ober-/unterhalb des Sichtbereichs
+GRID_SPACING=8
+GRID_PRELOAD_ROWS=2
 FLUEND=True
 FLUEND_STEPS=1
 FRAMES_PER_THUMBNAIL = FLUEND_STEPS*155
 THUMBNAIL_LOAD_THREAD_COUNT=2
+# Vorschauen werden mindestens in dieser Breite erzeugt und gecacht, kleinere Breiten daraus abgeleitet
+THUMBNAIL_MASTER_WIDTH=400
+# Obergrenze für Vorschau-Frames im Arbeitsspeicher
+THUMBNAIL_MEMORY_BUDGET_MB=int(os.environ.get("THUMBNAIL_MEMORY_MB", "512"))
+# Dekodierte Frames, die jede animierte Vorschau vorhält
+FRAME_RING_SIZE=3
+# "thread": Dekodieren im QThreadPool, "process": Dekodieren in einem Prozess-Pool über alle Kerne
+THUMBNAIL_BACKEND=os.environ.get("THUMBNAIL_BACKEND", "thread")
+THUMBNAIL_PROCESS_COUNT=os.cpu_count() or 2
+# Parallel gelesene Verzeichnisse beim Durchsuchen und Dateien pro gemeldeter Portion
+SCAN_THREAD_COUNT=8
+SCAN_BATCH_SIZE=1000
+# Änderungen an Tags, Lautstärke usw. werden so lange gesammelt und dann gemeinsam geschrieben
+METADATA_FLUSH_DELAY_MS=500
+# Duplikatsuche: gelesene Bytes an Anfang und Ende je Datei, parallel gehashte Dateien
+DUPLICATE_PARTIAL_BYTES=64*1024
+DUPLICATE_HASH_THREAD_COUNT=4
+# Maximal wartende Videos beim Schreiben in den Thumbnail-Cache
+CACHE_WRITE_QUEUE_SIZE=8
+# Größengrenze für .thumbcache; die Pflege startet erst, wenn der Start durch ist
+THUMBNAIL_CACHE_MAX_MB=int(os.environ.get("THUMBNAIL_CACHE_MB", "2048"))
+CACHE_MAINTENANCE_DELAY_MS=30000
+# Ab diesem Frame-Abstand wird gesprungen statt sequentiell weitergelesen
+SEQUENTIAL_MAX_STEP=250
+# Pro Video sequentielles Lesen und Seek-Pfad vergleichen (nur zur Messung)
+BENCHMARK_FRAME_EXTRACTION=os.environ.get("THUMBNAIL_BENCHMARK") == "1"
 
 class ThumbnailSignal(QObject):
     finished = pyqtSignal(str, list)
+    preview = pyqtSignal(str, object)  # Pfad, QImage für die Erstanzeige
+    stale = pyqtSignal(str)
+    done = pyqtSignal(str)
+
+class CancelToken:
+    # Wird von den Workern während des Dekodierens abgefragt
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
 
 class CachedThumbnailLoaderImage(QRunnable):
-    def __init__(self, path, cache_files, signal):
+    def __init__(self, path, disk_cache, signal, token=None):
         super().__init__()
         self.path = path
-        self.cache_files = cache_files
+        self.disk_cache = disk_cache
         self.signal = signal
+        self.token = token or CancelToken()
 
     def run(self):
-        from PyQt5.QtGui import QImage
         try:
-            images = [QImage(f) for f in self.cache_files if os.path.exists(f)]
-            if images and all(not img.isNull() for img in images):
-                self.signal.finished.emit(self.path, images)
+            if self.token.cancelled:
+                return
+            # Quelle seit dem Cachen verändert: nichts Veraltetes anzeigen, neu erzeugen lassen
+            if not self.disk_cache.is_current(self.path):
+                self.signal.stale.emit(self.path)
+                return
+            # JPEG-Bytes unverändert weitergeben, dekodiert wird erst bei der Anzeige
+            blobs = self.disk_cache.load(self.disk_cache.key_for(self.path))
+            if blobs:
+                self.signal.finished.emit(self.path, blobs)
         except Exception as e:
             print(f"Fehler beim Laden gecachter Thumbnails: {e}")
@@ -1,29 +1,47 @@
-import hashlib
-import json
+import multiprocessing
 import os
+import bisect
 import random
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-from PyQt5 import sip
-from PyQt5.QtCore import QTimer, Qt, QThreadPool, QStringListModel
-from PyQt5.QtGui import QPixmap, QImage
-from PyQt5.QtWidgets import QSplitter, QFileDialog, QScrollArea, QWidget, QSlider, QGridLayout, \
+from PyQt5.QtCore import QTimer, Qt, QThreadPool, QStringListModel, QEvent
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtWidgets import QSplitter, QFileDialog, QScrollArea, QWidget, QSlider, \
     QLabel, QProgressBar, QPushButton, QCheckBox, QGroupBox, QVBoxLayout, QHBoxLayout, QSizePolicy, QApplication, \
     QMessageBox, QLineEdit, QListWidget, QListWidgetItem, QDialog
 
-from core.common import ThumbnailSignal, CachedThumbnailLoaderImage, FRAMES_PER_THUMBNAIL, THUMBNAIL_DELAY, \
-    THUMBNAIL_LOAD_THREAD_COUNT
-from ui.video_thumbnail_loader import VideoThumbnailLoader
-from ui.video_thumbnail_widget import VideoThumbnailWidget
+from core.common import CachedThumbnailLoaderImage, THUMBNAIL_DELAY, \
+    THUMBNAIL_LOAD_THREAD_COUNT, CACHE_WRITE_QUEUE_SIZE, THUMBNAIL_BACKEND, THUMBNAIL_PROCESS_COUNT, \
+    THUMBNAIL_MEMORY_BUDGET_MB, THUMBNAIL_CACHE_MAX_MB, CACHE_MAINTENANCE_DELAY_MS, THUMBNAIL_MASTER_WIDTH, \
+    SUPPORTED_IMAGES, SUPPORTED_VIDEOS, METADATA_FLUSH_DELAY_MS
+from core.folder_watcher import FolderWatcher
+from core.thumbnail_cache import ThumbnailDiskCache, CacheMigration, CacheWriter, CacheMaintenance
+from core.thumbnail_scheduler import ThumbnailScheduler
+from core.thumbnail_memory import ThumbnailMemoryCache, FrameSequence
+from ui.video_thumbnail_loader import VideoThumbnailLoader, ProcessThumbnailLoader
+from ui.image_thumbnail_loader import ImageThumbnailLoader
+from ui.thumbnail_grid import ThumbnailGridModel, ThumbnailDelegate, ThumbnailGridView, PATH_ROLE
+from ui.animation_clock import AnimationClock
+from ui.tag_checkbox import TagCheckBox
 from core.substring_completer import SubstringCompleter
+from core.tag_index import TagIndex
+from core.metadata_store import MetadataStore, MetadataWriter
+from core.duplicate_finder import DuplicateFinder
 
 class ControlWindow(QWidget):
     def __init__(self, display_window):
         super().__init__()
-        self.settings_path = "settings.json"
+        # Bezugspunkt für die Startzeiten (Dateiliste, erste Vorschau, Abgleich)
+        self.startup_clock = time.monotonic()
+        self.startup_times = {}
+        # Tags, Zeitbereiche, Lautstärken und Einstellungen; übernimmt beim ersten Start die JSON-Dateien
+        self.metadata_store = MetadataStore("metadata.db")
+        # Geschrieben wird gebündelt im Hintergrund, nicht bei jedem Slider-Tick im GUI-Thread
+        self.metadata_writer = MetadataWriter(self.metadata_store, METADATA_FLUSH_DELAY_MS, self)
         self.display_window = display_window
 
 
-        self.active_thumbnail_widget = None
         self.tag_dialog = None
 
         # Letztes Verzeichnis laden
@@ -31,23 +49,56 @@ class ControlWindow(QWidget):
         if last_folder and os.path.isdir(last_folder):
             self.display_window.media_folder = last_folder
         self.is_closing = False
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
         self.volume_settings = self.load_volume_settings()
         self.thumbnail_cache_folder = os.path.join(os.getcwd(), ".thumbcache")
-        os.makedirs(self.thumbnail_cache_folder, exist_ok=True)
+        self.disk_cache = ThumbnailDiskCache(self.thumbnail_cache_folder)
+        self.cache_writer = CacheWriter(self.disk_cache, CACHE_WRITE_QUEUE_SIZE)
+        self.cache_maintenance = CacheMaintenance(self.disk_cache, THUMBNAIL_CACHE_MAX_MB * 1024 * 1024)
+        QTimer.singleShot(CACHE_MAINTENANCE_DELAY_MS, self.start_cache_maintenance)
+        self.memory_cache = ThumbnailMemoryCache(THUMBNAIL_MEMORY_BUDGET_MB * 1024 * 1024)
 
-        self.thumbnail_cache = {}  # Pfad → Liste von QPixmaps
         self.active_thumbnail_paths = set()
+        # Dateien ohne lesbare Frames, werden erst nach einer Änderung wieder angefragt
+        self.empty_thumbnail_paths = set()
+        self.tag_panel_outdated = False
+        self.visible_thumbnail_paths = set()
+        self.loaded_thumbnail_count = 0
+        self.total_thumbnail_count = 0
         self.setWindowTitle("Steuerung")
         self.display_window = display_window
         self.thumbnail_size = 400
         self.thread_pool = QThreadPool()
         self.thread_pool.setMaxThreadCount(THUMBNAIL_LOAD_THREAD_COUNT)
-        self.thumbnail_signals = []
-        self.path_to_label = {}
+        self.process_pool = None
+        if THUMBNAIL_BACKEND == "process":
+            # spawn statt fork: der GUI-Prozess hat bereits laufende Qt-Threads
+            self.process_pool = ProcessPoolExecutor(max_workers=THUMBNAIL_PROCESS_COUNT,
+                                                    mp_context=multiprocessing.get_context("spawn"))
+            # Die Threads warten nur auf die Prozesse, daher einer pro Prozess
+            self.thread_pool.setMaxThreadCount(THUMBNAIL_PROCESS_COUNT)
+        # Alte Einzel-JPEGs im Hintergrund in das gepackte Format überführen
+        self.thread_pool.start(CacheMigration(self.disk_cache), 1)
+        self.thumbnail_scheduler = ThumbnailScheduler(self.thread_pool, self)
+        self.thumbnail_scheduler.signal.finished.connect(self.replace_thumbnail)
+        self.thumbnail_scheduler.signal.stale.connect(self.rebuild_thumbnail)
+        self.thumbnail_scheduler.signal.done.connect(self.on_thumbnail_job_done)
+        self.thumbnail_scheduler.signal.preview.connect(self.show_exif_preview)
 
         self.video_ranges = self.load_video_ranges()
         self.display_window.video_ranges = self.video_ranges
 
+        # Ordneränderungen kommen einzeln an, statt den ganzen Ordner neu zu laden
+        self.media_filter = None  # Prädikat des aktiven Filters, None = alle Dateien
+        self.filter_state = None  # Gespeicherte Form davon für die nächste Sitzung
+        self.tag_index = TagIndex()
+        self.folder_watcher = FolderWatcher("folder_snapshot.json", SUPPORTED_IMAGES + SUPPORTED_VIDEOS, self)
+        self.folder_watcher.changed.connect(self.apply_media_changes)
+        self.folder_watcher.reconciled.connect(self.on_media_scan_finished)
+        self.duplicate_finder = DuplicateFinder(self.metadata_store, self)
+        self.duplicate_finder.progress.connect(self.on_duplicate_progress)
+        self.duplicate_finder.finished.connect(self.on_duplicates_found)
+
         self.choose_folder_button = QPushButton("Verzeichnis wählen")
         self.choose_folder_button.clicked.connect(self.choose_media_folder)
 
@@ -91,7 +142,11 @@ class ControlWindow(QWidget):
         self.tag_checkbox_scroll.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.tag_checkbox_scroll.setWidget(self.tag_checkbox_group)
 
+        self.tag_match_all_checkbox = QCheckBox("Alle gewählten Schlagwörter (UND)")
+        self.tag_match_all_checkbox.stateChanged.connect(self.apply_tag_filter)
+
         self.thumbnail_progress_label = QLabel("Thumbnails geladen: 0 / 0")
+        self.memory_stats_label = QLabel(self.memory_cache.stats_text())
 
         self.start_input = QLineEdit()
         self.start_input.setPlaceholderText("Startsekunde")
@@ -117,12 +172,17 @@ class ControlWindow(QWidget):
 
         self.video_time_label = QLabel("0.0 s")
 
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.preview_container = QWidget()
-        self.preview_layout = QGridLayout()
-        self.preview_container.setLayout(self.preview_layout)
-        self.scroll_area.setWidget(self.preview_container)
+        # Vorschau als Model/View: nur Zellen im Sichtbereich haben Frames und laufen animiert
+        self.thumbnail_model = ThumbnailGridModel(self)
+        self.thumbnail_view = ThumbnailGridView()
+        self.thumbnail_view.setModel(self.thumbnail_model)
+        self.thumbnail_view.setItemDelegate(ThumbnailDelegate(self.thumbnail_size, self.thumbnail_view))
+        self.thumbnail_view.set_cell_width(self.thumbnail_size)
+        self.thumbnail_view.visible_paths_changed.connect(self.load_visible_thumbnails)
+        self.thumbnail_view.clicked.connect(lambda index: self.handle_thumbnail_click(index.data(PATH_ROLE)))
+        # Ein gemeinsamer Takt für alle Animationen, pausiert solange das Fenster nicht sichtbar ist
+        self.animation_clock = AnimationClock(THUMBNAIL_DELAY, self)
+        self.thumbnail_view.set_animation_clock(self.animation_clock)
 
         self.video_slider = QSlider(Qt.Horizontal)
         self.video_slider.setRange(0, 1000)
@@ -211,8 +271,10 @@ class ControlWindow(QWidget):
         button_layout.addLayout(tags_row_layout)
 
 
+        button_layout.addWidget(self.tag_match_all_checkbox)
         button_layout.addWidget(self.tag_checkbox_scroll)
         button_layout.addWidget(self.thumbnail_progress_label)
+        button_layout.addWidget(self.memory_stats_label)
 
         button_widget = QWidget()
         button_widget.setLayout(button_layout)
@@ -222,7 +284,7 @@ class ControlWindow(QWidget):
 
         splitter = QSplitter(Qt.Horizontal)
         splitter.addWidget(button_widget)
-        splitter.addWidget(self.scroll_area)
+        splitter.addWidget(self.thumbnail_view)
         splitter.setStretchFactor(0, 1)
         splitter.setStretchFactor(1, 9)
 
@@ -230,12 +292,10 @@ class ControlWindow(QWidget):
         layout.addWidget(splitter)
         self.setLayout(layout)
 
-        QTimer.singleShot(100, self.load_media_files)
-
         self.timer = QTimer()
         self.timer.timeout.connect(self.check_video_range)
         self.timer.start(300)
-        QTimer.singleShot(100, self.load_and_filter_untagged_on_start)
+        QTimer.singleShot(0, self.start_session)
 
     def open_tag_assignment_dialog(self):
         path = self.display_window.current_media_path
@@ -274,10 +334,7 @@ class ControlWindow(QWidget):
                 new_tags = [t for t in typed_text.replace(",", " ").split() if t]
                 selected_tags.extend(new_tags)
 
-            self.media_tags[path] = " ".join(sorted(set(selected_tags)))
-            self.save_media_tags()
-            self.update_tag_checkboxes()
-            self.update_untagged_count()
+            self.set_media_tags(path, " ".join(sorted(set(selected_tags))))
             dialog.accept()
 
         save_button.clicked.connect(save_tags)
@@ -285,27 +342,83 @@ class ControlWindow(QWidget):
 
 
 
-    def load_and_filter_untagged_on_start(self):
-        self.load_media_files()
-        self.media_tags = self.load_media_tags()
-        self.update_tag_checkboxes()
-        self.filter_untagged_media()
+    def start_session(self):
+        # Einziger Startablauf: Dateiliste, Tags, Filter und Scrollposition der letzten Sitzung
+        # sofort zeigen; der Abgleich mit der Platte läuft danach im Hintergrund
+        session = self.load_session()
+        self.load_media_files(session.get("filter", {"mode": "untagged"}))
+        self.restore_scroll_position(session.get("scroll", 0))
+        self.record_startup_time("Dateiliste")
+
+    def record_startup_time(self, name):
+        if name not in self.startup_times:
+            self.startup_times[name] = (time.monotonic() - self.startup_clock) * 1000
+            print(f"Start: {name} nach {self.startup_times[name]:.0f} ms")
+
+    def restore_scroll_position(self, value):
+        if value:
+            self.thumbnail_view.doItemsLayout()
+            self.thumbnail_view.verticalScrollBar().setValue(value)
+
+    def load_session(self):
+        return self.metadata_store.get_setting("session", {})
+
+    def save_session(self):
+        try:
+            self.metadata_writer.set_setting("session", {
+                "filter": self.filter_state,
+                "scroll": self.thumbnail_view.verticalScrollBar().value(),
+            })
+        except Exception as e:
+            print(f"Fehler beim Speichern der Sitzung: {e}")
+
+    def restore_filter(self, state):
+        if state is None:
+            self.filtered_files = self.display_window.media_files
+            self.media_filter = None
+            self.filter_state = None
+            self.populate_thumbnails()
+        elif state.get("mode") == "untagged":
+            self.filter_untagged_media()
+        elif state.get("mode") == "tags":
+            # "tags" stammt aus Sitzungen vor UND/NICHT
+            states = dict.fromkeys(state.get("include", state.get("tags", [])), Qt.Checked)
+            states.update(dict.fromkeys(state.get("exclude", []), Qt.PartiallyChecked))
+            for tag, check_state in states.items():
+                checkbox = self.tag_checkboxes.get(tag)
+                if checkbox:
+                    checkbox.blockSignals(True)
+                    checkbox.setCheckState(check_state)
+                    checkbox.blockSignals(False)
+            self.tag_match_all_checkbox.blockSignals(True)
+            self.tag_match_all_checkbox.setChecked(state.get("match_all", False))
+            self.tag_match_all_checkbox.blockSignals(False)
+            self.apply_tag_filter()
+
+    def set_media_tags(self, path, tag_string):
+        # Unverändert gespeichert: weder Datei schreiben noch Tag-Leiste anfassen
+        if self.media_tags.get(path, "") == tag_string:
+            return
+        self.media_tags[path] = tag_string
+        added, removed = self.tag_index.set_tags(path, tag_string)
+        self.save_media_tags(path)
+        self.update_tag_panel(added | removed)
 
     def filter_untagged_media(self):
-        untagged_files = [path for path in self.display_window.media_files if not self.media_tags.get(path, "").strip()]
-        self.filtered_files = untagged_files
+        untagged = self.tag_index.untagged
+        self.filtered_files = [path for path in self.display_window.media_files if path in untagged]
+        self.media_filter = lambda path: path in self.tag_index.untagged
+        self.filter_state = {"mode": "untagged"}
         self.populate_thumbnails(self.filtered_files)
     def update_untagged_count(self):
-        count = sum(1 for path in self.display_window.media_files if not self.media_tags.get(path, "").strip())
-        self.untagged_count_label.setText(f"({count})")
+        self.untagged_count_label.setText(f"({len(self.tag_index.untagged)})")
 
     def show_untagged_media(self):
-        untagged = [path for path in self.display_window.media_files if not self.media_tags.get(path)]
-        self.filtered_files = untagged
-        self.populate_thumbnails(self.filtered_files)
+        self.filter_untagged_media()
 
     def load_and_update_tags(self):
         self.media_tags = self.load_media_tags()
+        self.tag_index.rebuild(self.display_window.media_files, self.media_tags)
         self.update_tag_checkboxes()
 
 
@@ -318,20 +431,12 @@ class ControlWindow(QWidget):
 
     def save_last_folder(self, folder_path):
         try:
-            with open(self.settings_path, "w") as f:
-                json.dump({"last_folder": folder_path}, f)
+            self.metadata_writer.set_setting("last_folder", folder_path)
         except Exception as e:
             print(f"Fehler beim Speichern des letzten Ordners: {e}")
 
     def load_last_folder(self):
-        if os.path.exists(self.settings_path):
-            try:
-                with open(self.settings_path, "r") as f:
-                    data = json.load(f)
-                    return data.get("last_folder")
-            except Exception as e:
-                print(f"Fehler beim Laden des letzten Ordners: {e}")
-        return None
+        return self.metadata_store.get_setting("last_folder")
 
     def start_slideshow(self):
         if self.slideshow_running:
@@ -423,12 +528,58 @@ class ControlWindow(QWidget):
 
         self.slideshow_timer.start(total_duration_ms)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_animation_state()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_animation_state()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self.update_animation_state()
+
+    def update_animation_state(self):
+        self.animation_clock.set_paused(not self.isVisible() or self.isMinimized())
+
     def closeEvent(self, event):
-        self.is_closing = True
-        self.thread_pool.waitForDone(2000)  # Warte max. 2 Sekunden auf alle Thumbnail-Threads
+        self.shutdown()
         self.display_window.close()  # Wichtig: auch Display-Fenster schließen
         QApplication.quit()
 
+    def shutdown(self):
+        # Läuft genau einmal: beim Schließen dieses Fensters oder über aboutToQuit,
+        # wenn das Display-Fenster die Anwendung beendet. Die Schreib-Threads sind Daemons,
+        # was hier nicht geschrieben wird, ginge beim Beenden verloren
+        if self.is_closing:
+            return
+        self.is_closing = True
+        self.save_session()
+        self.animation_clock.set_paused(True)
+        self.thumbnail_scheduler.cancel_all()
+        self.thread_pool.clear()
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+        self.thread_pool.waitForDone(2000)  # Warte max. 2 Sekunden auf alle Thumbnail-Threads
+        self.cache_maintenance.cancel()
+        self.duplicate_finder.cancel()
+        self.cache_writer.close()  # Ausstehende Cache-Dateien noch schreiben
+        self.disk_cache.write_manifest()  # Zugriffszeiten für die Cache-Pflege sichern
+        self.metadata_writer.close()
+        print(self.metadata_writer.stats_text())
+        self.metadata_store.close()
+
+    def start_cache_maintenance(self):
+        if not self.is_closing:
+            self.cache_maintenance.start(self.display_window.media_files)
+
+    def forget_media(self, path):
+        # Vorschau einer gelöschten Datei sofort freigeben statt auf die Cache-Pflege zu warten
+        self.disk_cache.forget(path)
+        self.memory_cache.discard(path)
+
     def update_volume_slider(self, path):
         volume = self.volume_settings.get(path, 50)
         self.volume_slider.blockSignals(True)  # verhindert triggern von save beim Setzen
@@ -441,38 +592,21 @@ class ControlWindow(QWidget):
         if path:
             self.volume_settings[path] = value
             self.display_window.media_player.setVolume(value)
-            self.save_volume_settings()
+            self.save_volume_settings(path)
 
     def load_volume_settings(self):
-        if os.path.exists("volume_settings.json"):
-            try:
-                with open("volume_settings.json", "r") as f:
-                    return json.load(f)
-            except Exception:
-                pass
-        return {}
-
-    def save_volume_settings(self):
-        with open("volume_settings.json", "w") as f:
-            json.dump(self.volume_settings, f, indent=2)
+        return self.metadata_store.load_volumes()
 
-    def get_cache_file_paths(self, path):
-        base = hashlib.sha256(path.encode('utf-8')).hexdigest()
-        files = [os.path.join(self.thumbnail_cache_folder, f"{base}_{i}.jpg") for i in range(FRAMES_PER_THUMBNAIL)]
-        return files
+    def save_volume_settings(self, path):
+        try:
+            self.metadata_writer.set_volume(path, self.volume_settings[path])
+        except Exception as e:
+            print(f"Fehler beim Speichern der Lautstärke: {e}")
 
     def update_tag_checkboxes(self):
-        from collections import Counter
-
-        # Aktuelle Mediendateien
-        current_files = set(self.display_window.media_files)
-
-        # Filtere Tags nur für aktuelle Dateien, aber behalte alle Tags dauerhaft
-        full_tags = self.media_tags
-        filtered_tags = {path: tags for path, tags in full_tags.items() if path in current_files}
-        self.filtered_media_tags = filtered_tags
-        self.media_tags = full_tags  # alle Tags bleiben erhalten
-        self.save_media_tags()  # Optional: speichert sofort die bereinigte Datei
+        # Vollständiger Neuaufbau beim Laden eines Ordners; einzelne Änderungen über update_tag_panel
+        # Auswahl über den Neuaufbau retten, ohne dabei den Filter neu auszulösen
+        states = {tag: cb.checkState() for tag, cb in getattr(self, 'tag_checkboxes', {}).items()}
 
         # Alte Checkboxen entfernen
         for i in reversed(range(self.tag_checkbox_layout.count())):
@@ -481,15 +615,11 @@ class ControlWindow(QWidget):
                 widget.setParent(None)
 
         # Neue Checkboxen basierend auf vorhandenen Tags der aktuellen Dateien
-        tag_counter = Counter()
-        for tags_str in self.filtered_media_tags.values():
-            tag_list = tags_str.strip().lower().split()
-            tag_counter.update(tag_list)
+        tag_counter = self.tag_index.counts()
 
         self.tag_checkboxes = {}
         for tag, count in sorted(tag_counter.items()):
-            checkbox = QCheckBox(f"{tag} ({count})")
-            checkbox.stateChanged.connect(self.apply_tag_filter)
+            checkbox = self.create_tag_checkbox(tag, count, states.get(tag, Qt.Unchecked))
             self.tag_checkbox_layout.addWidget(checkbox)
             self.tag_checkboxes[tag] = checkbox
         if hasattr(self, 'tag_combobox'):
@@ -503,97 +633,167 @@ class ControlWindow(QWidget):
                 item = QListWidgetItem(tag)
                 self.tag_list_widget.addItem(item)
 
+    def create_tag_checkbox(self, tag, count, check_state=Qt.Unchecked):
+        checkbox = TagCheckBox(f"{tag} ({count})")
+        checkbox.setToolTip("Markiert: einschließen, halb markiert: ausschließen")
+        checkbox.setCheckState(check_state)
+        checkbox.stateChanged.connect(self.apply_tag_filter)
+        return checkbox
+
+    def update_tag_panel(self, tags):
+        # Nur die betroffenen Schlagwörter: Zähler anpassen, neue einsortieren, verschwundene entfernen
+        vocabulary_changed = False
+        for tag in tags:
+            count = self.tag_index.count(tag)
+            checkbox = self.tag_checkboxes.get(tag)
+            if checkbox and count:
+                checkbox.setText(f"{tag} ({count})")
+            elif checkbox:
+                del self.tag_checkboxes[tag]
+                checkbox.setParent(None)
+                for item in self.tag_list_widget.findItems(tag, Qt.MatchExactly):
+                    self.tag_list_widget.takeItem(self.tag_list_widget.row(item))
+                vocabulary_changed = True
+            elif count:
+                position = bisect.bisect(sorted(self.tag_checkboxes), tag)
+                self.tag_checkboxes[tag] = self.create_tag_checkbox(tag, count)
+                self.tag_checkbox_layout.insertWidget(position, self.tag_checkboxes[tag])
+                self.tag_list_widget.insertItem(position, QListWidgetItem(tag))
+                vocabulary_changed = True
+
+        if vocabulary_changed:
+            if hasattr(self, 'tag_combobox'):
+                self.tag_combobox.clear()
+                self.tag_combobox.addItems(sorted(self.tag_checkboxes))
+            if hasattr(self, 'tag_completer'):
+                self.tag_completer.setModel(QStringListModel(sorted(self.tag_checkboxes)))
+
     def apply_tag_filter(self):
-        selected_tags = [tag for tag, cb in self.tag_checkboxes.items() if cb.isChecked()]
-        if not selected_tags:
+        include = [tag for tag, cb in self.tag_checkboxes.items() if cb.checkState() == Qt.Checked]
+        exclude = [tag for tag, cb in self.tag_checkboxes.items() if cb.checkState() == Qt.PartiallyChecked]
+        match_all = self.tag_match_all_checkbox.isChecked()
+        if not include and not exclude:
             self.filtered_files = self.display_window.media_files
+            self.media_filter = None
+            self.filter_state = None
+            self.tag_checkbox_group.setTitle("Verfügbare Schlagwörter")
         else:
-            filtered_files = []
-            for path in self.display_window.media_files:
-                tags_str = self.media_tags.get(path, "")
-                tags_set = set(tags_str.lower().split())
-                if tags_set & set(selected_tags):  # mindestens ein Tag passt
-                    filtered_files.append(path)
-            self.filtered_files = filtered_files
+            # Mengenoperationen auf dem Index, die Reihenfolge kommt aus der Dateiliste
+            matches = self.tag_index.query(include, exclude, match_all)
+            self.filtered_files = [path for path in self.display_window.media_files if path in matches]
+            self.media_filter = lambda path: self.tag_index.matches(path, include, exclude, match_all)
+            self.filter_state = {"mode": "tags", "include": include, "exclude": exclude, "match_all": match_all}
+            self.tag_checkbox_group.setTitle(f"Verfügbare Schlagwörter – {len(matches)} Treffer")
 
         self.populate_thumbnails(self.filtered_files)
 
     def load_media_tags(self):
-        if os.path.exists("media_tags.json"):
-            try:
-                with open("media_tags.json", "r") as f:
-                    return json.load(f)
-            except Exception:
-                return {}
-        return {}
+        return self.metadata_store.load_tags()
 
-    def save_media_tags(self):
-        import tempfile
-        import shutil
-
-        temp_path = "media_tags.json.tmp"
+    def save_media_tags(self, path):
+        # Nur die Zeilen dieser Datei, unabhängig von der Größe der Bibliothek
         try:
-            with open(temp_path, "w") as f:
-                json.dump(self.media_tags, f, indent=2)
-            shutil.move(temp_path, "media_tags.json")
+            self.metadata_writer.set_tags(path, self.media_tags.get(path, ""))
             self.update_untagged_count()
         except Exception as e:
             print(f"Fehler beim sicheren Speichern der Tags: {e}")
 
     def cleanup_duplicates(self):
-        from PyQt5.QtWidgets import QMessageBox
-        folder = self.display_window.media_folder
-        supported = self.display_window.supported_images + self.display_window.supported_videos
-        seen = {}
-        removed = 0
-        for filename in os.listdir(folder):
-            if filename.lower().endswith(supported):
-                filepath = os.path.join(folder, filename)
-                try:
-                    filesize = os.path.getsize(filepath)
-                    filehash = self.compute_hash(filepath)
-                    if filehash is None:
-                        continue
-                    if filesize in seen:
-                        if seen[filesize] == filehash:
-                            os.remove(filepath)
-                            removed += 1
-                            if filepath in self.display_window.media_files:
-                                self.display_window.media_files.remove(filepath)
-                        else:
-                            continue  # andere Datei mit gleicher Größe
-                    else:
-                        seen[filesize] = filehash
-                except Exception as e:
-                    print(f"Fehler bei Datei {filename}: {e}")
-
-        self.display_window.show_random_media()
-        self.populate_thumbnails()
-        QMessageBox.information(self, "Bereinigt", f"{removed} Duplikate entfernt.")
-
-    def compute_hash(self, filepath):
-        import hashlib
-        hash_sha256 = hashlib.sha256()
-        try:
-            with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(8192), b""):
-                    hash_sha256.update(chunk)
-            return hash_sha256.hexdigest()
-        except OSError:
-            return None
+        # Suche läuft im Hintergrund, gelöscht wird erst nach Durchsicht der Gruppen
+        self.cleanup_button.setEnabled(False)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setVisible(True)
+        self.duplicate_finder.find(self.display_window.media_files)
 
-    def load_video_ranges(self):
-        if os.path.exists("video_ranges.json"):
+    def on_duplicate_progress(self, stage, done, total):
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(done)
+        self.progress_bar.setFormat(f"{stage}: %v / %m")
+
+    def on_duplicates_found(self, groups):
+        self.progress_bar.resetFormat()
+        self.progress_bar.setVisible(False)
+        self.cleanup_button.setEnabled(True)
+        if self.is_closing:
+            return
+        if not groups:
+            QMessageBox.information(self, "Bereinigt", "Keine Duplikate gefunden.")
+            return
+
+        paths = self.review_duplicates(groups)
+        if not paths:
+            return
+        removed = []
+        for path in paths:
             try:
-                with open("video_ranges.json", "r") as f:
-                    return json.load(f)
-            except Exception:
-                return {}
-        return {}
+                os.remove(path)
+            except Exception as e:
+                print(f"Fehler bei Datei {os.path.basename(path)}: {e}")
+                continue
+            self.forget_media(path)
+            removed.append(path)
+        self.metadata_store.forget_hashes(removed)
+        self.apply_media_changes([], removed, [])
+        QMessageBox.information(self, "Bereinigt", f"{len(removed)} Duplikate entfernt.")
+
+    def review_duplicates(self, groups):
+        # Markiert = löschen; vorbelegt bleibt je Gruppe die älteste Datei erhalten
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Duplikate prüfen")
+        dialog.setMinimumSize(600, 500)
+        layout = QVBoxLayout(dialog)
+
+        wasted = sum(os.path.getsize(group[0]) * (len(group) - 1) for group in groups if os.path.exists(group[0]))
+        layout.addWidget(QLabel(f"{len(groups)} Gruppen, {wasted / (1024 * 1024):.1f} MB doppelt belegt"))
+
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_widget = QWidget()
+        scroll_layout = QVBoxLayout(scroll_widget)
+        scroll_area.setWidget(scroll_widget)
+        layout.addWidget(scroll_area)
+
+        group_checkboxes = []
+        for group in groups:
+            box = QGroupBox(f"{len(group)} gleiche Dateien")
+            box_layout = QVBoxLayout(box)
+            checkboxes = {}
+            for index, path in enumerate(group):
+                cb = QCheckBox(path)
+                cb.setChecked(index > 0)
+                box_layout.addWidget(cb)
+                checkboxes[path] = cb
+            group_checkboxes.append(checkboxes)
+            scroll_layout.addWidget(box)
+        scroll_layout.addStretch()
+
+        button_layout = QHBoxLayout()
+        delete_button = QPushButton("Markierte löschen")
+        cancel_button = QPushButton("Abbrechen")
+        button_layout.addWidget(delete_button)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+
+        def confirm():
+            if any(all(cb.isChecked() for cb in checkboxes.values()) for checkboxes in group_checkboxes):
+                QMessageBox.warning(dialog, "Duplikate prüfen", "Von jeder Gruppe muss eine Datei erhalten bleiben.")
+                return
+            dialog.accept()
 
-    def save_video_ranges(self):
-        with open("video_ranges.json", "w") as f:
-            json.dump(self.video_ranges, f, indent=2)
+        delete_button.clicked.connect(confirm)
+        cancel_button.clicked.connect(dialog.reject)
+        if dialog.exec_() != QDialog.Accepted:
+            return []
+        return [path for checkboxes in group_checkboxes for path, cb in checkboxes.items() if cb.isChecked()]
+
+    def load_video_ranges(self):
+        return self.metadata_store.load_ranges()
+
+    def save_video_ranges(self, path):
+        try:
+            self.metadata_writer.set_range(path, self.video_ranges.get(path))
+        except Exception as e:
+            print(f"Fehler beim Speichern des Zeitbereichs: {e}")
 
     def set_video_range(self):
         path = self.display_window.current_media_path
@@ -610,29 +810,52 @@ class ControlWindow(QWidget):
 
         # Zeitbereich speichern
         self.video_ranges[path] = {"start": start, "end": end}
-        self.save_video_ranges()
+        self.save_video_ranges(path)
         print(f"Bereich für {os.path.basename(path)} gesetzt: {start}-{end}s")
 
-        # Cache löschen
-        for f in self.get_cache_file_paths(path):
-            if os.path.exists(f):
-                try:
-                    os.remove(f)
-                except Exception as e:
-                    print(f"Fehler beim Löschen von Cache-Datei {f}: {e}")
-
-        # Neuen Vorschaulader starten nur für dieses eine Video
-        signal = ThumbnailSignal()
-        self.thumbnail_signals.append(signal)
-        signal.finished.connect(self.replace_thumbnail)
-        self.active_thumbnail_paths.add(path)
-
-        if all(os.path.exists(f) for f in self.get_cache_file_paths(path)):
-            worker = CachedThumbnailLoaderImage(path, self.get_cache_file_paths(path), signal)
-        else:
-            worker = VideoThumbnailLoader(path, self.thumbnail_size, signal, self.video_ranges)
+        # Zuordnung zum alten Cache-Eintrag lösen, der neue Bereich ergibt einen neuen Schlüssel
+        self.disk_cache.forget(path)
+        self.memory_cache.discard(path)
 
-        self.thread_pool.start(worker)
+        # Neuen Vorschaulader starten nur für dieses eine Video, ein laufender alter Job wird abgebrochen
+        self.empty_thumbnail_paths.discard(path)
+        self.start_thumbnail_job(path, requeue=True)
+
+    def start_thumbnail_job(self, path, priority=0, requeue=False):
+        if path not in self.active_thumbnail_paths:
+            self.active_thumbnail_paths.add(path)
+            self.total_thumbnail_count += 1
+        self.thumbnail_scheduler.request(path, priority, lambda signal, token: self.create_thumbnail_worker(
+            path, signal, token), requeue)
+
+    def create_thumbnail_worker(self, path, signal, token):
+        # Erst beim Start entscheiden: der Cache kann inzwischen gefüllt sein
+        if self.disk_cache.has(path, self.thumbnail_size):
+            return CachedThumbnailLoaderImage(path, self.disk_cache, signal, token)
+        return self.create_source_loader(path, signal, token)
+
+    def generation_width(self):
+        return max(self.thumbnail_size, THUMBNAIL_MASTER_WIDTH)
+
+    def create_source_loader(self, path, signal, token):
+        if path.lower().endswith(self.display_window.supported_images):
+            return ImageThumbnailLoader(path, self.generation_width(), signal, self.disk_cache, self.cache_writer, token,
+                                        self.thumbnail_size)
+        return self.create_video_loader(path, signal, token)
+
+    def create_video_loader(self, path, signal, token):
+        if self.process_pool is not None:
+            return ProcessThumbnailLoader(path, self.generation_width(), signal, self.video_ranges, self.disk_cache,
+                                          self.cache_writer, self.process_pool, token)
+        return VideoThumbnailLoader(path, self.generation_width(), signal, self.video_ranges, self.disk_cache,
+                                    self.cache_writer, token)
+
+    def rebuild_thumbnail(self, path):
+        # Quelldatei hat sich geändert: Vorschau im Hintergrund neu erzeugen
+        if path not in self.active_thumbnail_paths:
+            return
+        self.thumbnail_scheduler.request(path, 0, lambda signal, token: self.create_source_loader(
+            path, signal, token), requeue=True)
 
     def check_video_range(self):
         path = self.display_window.current_media_path
@@ -659,85 +882,145 @@ class ControlWindow(QWidget):
         if current >= bounds["end"]:
             self.display_window.media_player.setPosition(int(bounds["start"] * 1000))
 
-    def load_media_files(self):
+    def load_media_files(self, filter_state=None):
+        # Stand der letzten Sitzung sofort anzeigen, Abweichungen meldet der FolderWatcher.
+        # Beim ersten Öffnen eines Ordners kommen die Dateien portionsweise aus der Suche (auch Unterordner).
         folder = self.display_window.media_folder
-        files = os.listdir(folder)
-        media_files = []
-        total = len(files)
+        self.progress_bar.setRange(0, 0)
         self.progress_bar.setVisible(True)
-
-        for i, f in enumerate(files):
-            if f.lower().endswith(self.display_window.supported_images + self.display_window.supported_videos):
-                media_files.append(os.path.join(folder, f))
-            self.progress_bar.setValue(int((i + 1) / total * 100))
-            QApplication.processEvents()
-
-        self.display_window.media_files = media_files
-        self.progress_bar.setVisible(False)
-        self.populate_thumbnails()
+        self.display_window.media_files = self.folder_watcher.watch(folder)
         self.slideshow_media_files = list(self.display_window.media_files)
         self.media_tags = self.load_media_tags()
+        self.tag_index.rebuild(self.display_window.media_files, self.media_tags)
         self.update_tag_checkboxes()
+        # Das Grid wird genau einmal aufgebaut, direkt mit dem passenden Filter
+        self.restore_filter(filter_state)
+        self.update_untagged_count()
+
+    def on_media_scan_finished(self):
+        self.progress_bar.setVisible(False)
+        if self.tag_panel_outdated:
+            self.tag_panel_outdated = False
+            self.update_tag_checkboxes()
+        self.record_startup_time("Abgleich mit der Platte")
+
+    def apply_media_changes(self, added, removed, modified):
+        # Neue, gelöschte und geänderte Dateien einzeln einarbeiten. Der Tag-Index kennt alle aktuellen
+        # Dateien, die Prüfung auf Bekanntes kostet so nur die Größe der Änderung
+        gone = {path for path in removed if path in self.tag_index.tags_by_path}
+        new = [path for path in added if path not in self.tag_index.tags_by_path]
+        had_tags = any(self.tag_index.tags_by_path[path] for path in gone)
+        self.tag_index.remove_files(gone)
+        self.tag_index.add_files(new, self.media_tags)
+        shown = [path for path in new if self.media_filter is None or self.media_filter(path)]
+
+        if gone:
+            # Listen neu bauen statt verändern, weil filtered_files dieselbe Liste wie media_files sein kann
+            self.display_window.media_files = [path for path in self.display_window.media_files
+                                               if path not in gone] + new
+            self.slideshow_media_files = [path for path in getattr(self, 'slideshow_media_files', [])
+                                          if path not in gone] + new
+            if hasattr(self, 'filtered_files'):
+                self.filtered_files = [path for path in self.filtered_files if path not in gone] + shown
+        elif new:
+            # Nur Zugänge, z.B. die Portionen der ersten Ordnersuche: anhängen statt alles neu aufzubauen
+            media_files = self.display_window.media_files
+            filtered_files = getattr(self, 'filtered_files', None)
+            if filtered_files is media_files and len(shown) != len(new):
+                # Ohne Filter wächst filtered_files mit media_files mit; sonst eigene Liste
+                self.filtered_files = filtered_files = list(media_files)
+            media_files.extend(new)
+            if filtered_files is not None and filtered_files is not media_files:
+                filtered_files.extend(shown)
+            if hasattr(self, 'slideshow_media_files'):
+                self.slideshow_media_files.extend(new)
+            else:
+                self.slideshow_media_files = list(new)
+
+        for path in gone:
+            self.memory_cache.discard(path)
+            self.empty_thumbnail_paths.discard(path)
+        self.thumbnail_model.remove_paths(gone)
+        self.thumbnail_model.insert_paths(shown)
+
+        # Geänderte Dateien: alte Frames verwerfen, der Plattencache erkennt sie als veraltet
+        for path in modified:
+            self.memory_cache.discard(path)
+            self.empty_thumbnail_paths.discard(path)
+            self.thumbnail_model.drop_frames(path)
+        if modified:
+            self.thumbnail_view.schedule_visible_update()
+
+        if self.display_window.current_media_path in gone:
+            self.display_window.show_random_media()
+        if had_tags or any(self.tag_index.tags_by_path[path] for path in new):
+            # Während der Suche nur vormerken, das Schlagwort-Panel wird einmal am Ende neu aufgebaut
+            if self.folder_watcher.scanning:
+                self.tag_panel_outdated = True
+            else:
+                self.update_tag_checkboxes()
         self.update_untagged_count()
 
     def populate_thumbnails(self, files=None):
         if files is None:
             files = self.display_window.media_files
 
+        # Gezählt werden die angeforderten Vorschauen, angefordert wird nur, was sichtbar wird
         self.loaded_thumbnail_count = 0
-        self.total_thumbnail_count = len(files)
-        self.thumbnail_progress_label.setText(f"Thumbnails geladen: 0 / {self.total_thumbnail_count}")
+        self.total_thumbnail_count = 0
+        self.update_thumbnail_progress()
         self.active_thumbnail_paths.clear()
-        self.thread_pool.clear()
+        self.visible_thumbnail_paths = set()
+        self.thumbnail_scheduler.cancel_all()
 
-        # Alle bestehenden Widgets im Grid entfernen
-        for i in reversed(range(self.preview_layout.count())):
-            widget = self.preview_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
+        self.thumbnail_model.set_paths(files)
 
-        col_count = 3
-        for idx, path in enumerate(files):
-            placeholder = QLabel("Lade...", self.preview_container)
-            placeholder.setFixedWidth(self.thumbnail_size)
-            placeholder.setAlignment(Qt.AlignCenter)
-            placeholder.mousePressEvent = lambda e, p=path, w = placeholder: self.handle_thumbnail_click(p, w)
-            self.preview_layout.addWidget(placeholder, idx // col_count, idx % col_count)
-            self.path_to_label[path] = placeholder
-
-            # Bilddateien sofort anzeigen
-            if path.lower().endswith(self.display_window.supported_images):
-                pixmap = QPixmap(path).scaledToWidth(self.thumbnail_size, Qt.SmoothTransformation)
-                placeholder.setPixmap(pixmap)
-                self.loaded_thumbnail_count += 1
-                self.thumbnail_progress_label.setText(
-                    f"Thumbnails geladen: {self.loaded_thumbnail_count} / {self.total_thumbnail_count}"
-                )
+    def load_visible_thumbnails(self, paths):
+        self.visible_thumbnail_paths = set(paths)
+
+        # Zellen, die den Sichtbereich verlassen haben, geben ihre Frames frei
+        for path in self.thumbnail_model.loaded_paths():
+            if path not in self.visible_thumbnail_paths:
+                self.thumbnail_model.drop_frames(path)
+
+        # Die Reihenfolge von paths ist die Priorität: sichtbare Zeilen zuerst, dann der Vorlauf
+        for priority, path in enumerate(paths):
+            if self.thumbnail_model.has_frames(path) or path in self.empty_thumbnail_paths:
                 continue
 
-            # Für Videos: Cache prüfen
-            cache_files = self.get_cache_file_paths(path)
-            signal = ThumbnailSignal()
-            self.thumbnail_signals.append(signal)
-            signal.finished.connect(self.replace_thumbnail)
-            self.active_thumbnail_paths.add(path)
+            # Noch im Arbeitsspeicher: ohne Job sofort anzeigen
+            frames = self.memory_cache.get(path)
+            if frames is not None:
+                self.thumbnail_model.set_frames(path, frames)
+                continue
 
-            if all(os.path.exists(f) for f in cache_files):
-                worker = CachedThumbnailLoaderImage(path, cache_files, signal)
-            else:
-                worker = VideoThumbnailLoader(path, self.thumbnail_size, signal, self.video_ranges)
+            # Bilder und Videos: Cache prüfen, sonst im Hintergrund verkleinert dekodieren.
+            # JPEGs ohne Cache-Eintrag liefern vorher ihr EXIF-Vorschaubild
+            self.start_thumbnail_job(path, priority)
 
-            self.thread_pool.start(worker)
+        # Weggescrollte oder herausgefilterte Videos nicht weiter dekodieren
+        for path in self.thumbnail_scheduler.retain(paths):
+            if path in self.active_thumbnail_paths:
+                self.active_thumbnail_paths.discard(path)
+                self.total_thumbnail_count -= 1
 
-    def handle_thumbnail_click(self, path, widget):
-        # Rahmen des vorherigen Widgets entfernen
-        if self.active_thumbnail_widget is not None and not sip.isdeleted(self.active_thumbnail_widget):
-            self.active_thumbnail_widget.setStyleSheet("")
+        self.update_thumbnail_progress()
+
+    def show_exif_preview(self, path, image):
+        # Gelesen und skaliert wurde im Worker, hier nur noch anzeigen
+        if self.is_closing or path not in self.active_thumbnail_paths or path not in self.visible_thumbnail_paths:
+            return
+        if not self.thumbnail_model.has_frames(path):
+            self.thumbnail_model.set_frames(path, [QPixmap.fromImage(image)])
+            self.record_startup_time("erste Vorschau")
 
-        # Neuen Rahmen setzen
-        widget.setStyleSheet("border: 2px solid red;")
-        self.active_thumbnail_widget = widget
+    def update_thumbnail_progress(self):
+        self.thumbnail_progress_label.setText(
+            f"Thumbnails geladen: {self.loaded_thumbnail_count} / {self.total_thumbnail_count}"
+        )
+        self.memory_stats_label.setText(self.memory_cache.stats_text())
 
+    def handle_thumbnail_click(self, path):
         # Restliche Aktionen
         if self.autostart_checkbox.isChecked():
             self.display_window.show_specific_media(path, 0)
@@ -812,10 +1095,7 @@ class ControlWindow(QWidget):
             typed = self.tag_dialog.new_tag_input.text().strip().lower()
             if typed:
                 selected.extend(t for t in typed.replace(",", " ").split() if t)
-            self.media_tags[self.tag_dialog.path] = " ".join(sorted(set(selected)))
-            self.save_media_tags()
-            self.update_tag_checkboxes()
-            self.update_untagged_count()
+            self.set_media_tags(self.tag_dialog.path, " ".join(sorted(set(selected))))
             # self.tag_dialog.accept()
 
         save_button.clicked.connect(save_tags)
@@ -845,7 +1125,7 @@ class ControlWindow(QWidget):
         if hasattr(self, 'tag_combobox'):
             self.tag_combobox.setCurrentText("")
 
-    def replace_thumbnail(self, path, image_or_frames):
+    def replace_thumbnail(self, path, blobs):
 
         if getattr(self, "is_closing", False):
             return
@@ -853,48 +1133,43 @@ class ControlWindow(QWidget):
         if path not in self.active_thumbnail_paths:
             return
 
-        # Wenn image_or_frames eine Liste von QImage ist, wandle sie um
-        if isinstance(image_or_frames[0], QImage):
-            frames = [QPixmap.fromImage(img) for img in image_or_frames]
-        else:
-            frames = image_or_frames
+        self.mark_thumbnail_handled(path)
 
-        self.thumbnail_cache[path] = frames
-        label = self.path_to_label.get(path)
-        if label is None or not isinstance(label, QLabel):
-            return
+        # Inzwischen aus dem Sichtbereich gescrollt: Frames liegen im Plattencache, nicht behalten
+        if path in self.visible_thumbnail_paths:
+            # Frames bleiben komprimiert, dekodiert wird erst beim Zeichnen
+            frames = FrameSequence(blobs, self.thumbnail_size)
+            self.memory_cache.put(path, frames, protected=self.visible_thumbnail_paths)
+            self.thumbnail_model.set_frames(path, frames)
+            self.record_startup_time("erste Vorschau")
 
-        index = self.preview_layout.indexOf(label)
-        if index != -1:
-            row, col, _, _ = self.preview_layout.getItemPosition(index)
-            self.preview_layout.removeWidget(label)
-            label.deleteLater()
+        self.update_thumbnail_progress()
 
-            widget = VideoThumbnailWidget(frames, interval=THUMBNAIL_DELAY)
-            widget.mousePressEvent = lambda e, w=widget, p=path: self.handle_thumbnail_click(p, w)
-            self.preview_layout.addWidget(widget, row, col)
-            self.path_to_label[path] = widget
+    def on_thumbnail_job_done(self, path):
+        # Der Scheduler hat den Job bereits ausgetragen. Ist der Pfad noch offen und nicht erneut angefragt,
+        # kam kein finished: die Quelle liefert keine Frames (unlesbar, leer) und zählt trotzdem als erledigt
+        if getattr(self, "is_closing", False) or path not in self.active_thumbnail_paths:
+            return
+        if path in self.thumbnail_scheduler.running or path in self.thumbnail_scheduler.pending:
+            return
+        self.empty_thumbnail_paths.add(path)
+        self.mark_thumbnail_handled(path)
+        self.update_thumbnail_progress()
 
+    def mark_thumbnail_handled(self, path):
         self.active_thumbnail_paths.discard(path)
         self.loaded_thumbnail_count += 1
-        self.thumbnail_progress_label.setText(
-            f"Thumbnails geladen: {self.loaded_thumbnail_count} / {self.total_thumbnail_count}"
-        )
-
         if self.loaded_thumbnail_count == self.total_thumbnail_count:
             self.start_slideshow_button.setEnabled(True)
 
-        # Speichern im Cache-Verzeichnis
-        cache_files = self.get_cache_file_paths(path)
-        for pixmap, cache_path in zip(frames, cache_files):
-            pixmap.save(cache_path, "JPEG")
-
-
     def update_thumbnails_from_input(self):
         try:
             width = int(self.thumb_width_input.text())
             if 20 <= width <= 1000:
                 self.thumbnail_size = width
+                # Quelldateien bleiben unberührt, solange der Cache breit genug ist
+                self.memory_cache.rescale(width)
+                self.thumbnail_view.set_cell_width(width)
                 self.populate_thumbnails()
             else:
                 print("Bitte eine Breite zwischen 20 und 1000 eingeben.")
@@ -920,12 +1195,8 @@ class ControlWindow(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Fehler beim Löschen", str(e))
             return
-
-        if path in self.display_window.media_files:
-            self.display_window.media_files.remove(path)
-
-        self.display_window.show_random_media()
-        self.populate_thumbnails()
+        self.forget_media(path)
+        self.apply_media_changes([], [path], [])
 
     def slider_pressed(self):
         self.slider_was_moved = True
@@ -6,6 +6,8 @@ from PyQt5.QtWidgets import QWidget, QLabel, QSizePolicy, QStackedLayout, QVBoxL
 
 import random
 
+from core.common import SUPPORTED_IMAGES, SUPPORTED_VIDEOS
+
 
 class LeftBar(QWidget):
     def __init__(self, parent=None):
@@ -66,8 +68,8 @@ class DisplayWindow(QWidget):
         self.setContentsMargins(0, 0, 0, 0)
         self.setStyleSheet("background-color: black; margin: 0px; padding: 0px; border: 0px;")
 
-        self.supported_images = ('.jpg', '.jpeg', '.png')
-        self.supported_videos = ('.mp4', '.mov', '.avi', '.mkv')
+        self.supported_images = SUPPORTED_IMAGES
+        self.supported_videos = SUPPORTED_VIDEOS
         self.media_files = []
         self.current_media_path = None
 
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from core.common import DUPLICATE_PARTIAL_BYTES, DUPLICATE_HASH_THREAD_COUNT
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def partial_hash(path, size):
+    # Anfang und Ende der Datei; kleine Dateien werden dabei ganz gelesen.
+    # Liefert (Hash, vollständig) – ein vollständiger Hash erspart die dritte Stufe.
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        if size <= 2 * DUPLICATE_PARTIAL_BYTES:
+            digest.update(f.read())
+            return digest.hexdigest(), True
+        digest.update(f.read(DUPLICATE_PARTIAL_BYTES))
+        f.seek(size - DUPLICATE_PARTIAL_BYTES)
+        digest.update(f.read(DUPLICATE_PARTIAL_BYTES))
+    return digest.hexdigest(), False
+
+
+def full_hash(path):
+    # hashlib gibt bei großen Blöcken die GIL frei, Threads laufen also wirklich parallel
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def group_by(items, key):
+    groups = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+class DuplicateFinder(QObject):
+    # Sucht Duplikate in drei Stufen: gleiche Größe → gleicher Anfang/Ende → gleicher Inhalt.
+    # Nur die verbleibenden Kandidaten werden ganz gelesen. Hashes liegen im MetadataStore
+    # und gelten, solange Größe und mtime der Datei passen.
+    progress = pyqtSignal(str, int, int)  # Stufe, erledigt, gesamt
+    finished = pyqtSignal(list)  # Gruppen gleicher Dateien, jeweils Liste von Pfaden
+
+    def __init__(self, metadata_store, parent=None):
+        super().__init__(parent)
+        self.metadata_store = metadata_store
+        self.generation = 0
+        self.stats = {}
+
+    def find(self, paths):
+        self.generation += 1
+        threading.Thread(target=self.run, args=(list(paths), self.generation), name="DuplicateFinder",
+                         daemon=True).start()
+
+    def cancel(self):
+        self.generation += 1
+
+    def run(self, paths, generation):
+        try:
+            groups = self.find_groups(paths, generation)
+            if groups is not None and generation == self.generation:
+                self.finished.emit(groups)
+        except Exception as e:
+            print(f"Fehler bei der Duplikatsuche: {e}")
+
+    def find_groups(self, paths, generation):
+        files = {}  # Pfad → [Größe, mtime, Teil-Hash, voller Hash]
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            # Leere Dateien sind keine sinnvollen Duplikate
+            if stat.st_size:
+                files[path] = [stat.st_size, stat.st_mtime_ns, None, None]
+        self.stats = {"files": len(files), "partial": 0, "full": 0, "cached": 0}
+
+        cached = self.metadata_store.load_hashes(files)
+        for path, entry in files.items():
+            hit = cached.get(path)
+            if hit and hit[0] == entry[0] and hit[1] == entry[1]:
+                entry[2], entry[3] = hit[2], hit[3]
+
+        candidates = [path for group in group_by(files, lambda p: files[p][0]) for path in group]
+        if not self.hash_stage("Anfang/Ende", candidates, files, 2, generation):
+            return None
+        candidates = [path for group in group_by(candidates, lambda p: (files[p][0], files[p][2]))
+                      for path in group]
+        if not self.hash_stage("Inhalt", candidates, files, 3, generation):
+            return None
+
+        groups = group_by(candidates, lambda p: (files[p][0], files[p][3]))
+        # Innerhalb einer Gruppe zuerst die älteste Datei, sie bleibt standardmäßig erhalten
+        groups = [sorted(group, key=lambda p: (files[p][1], p)) for group in groups]
+        groups.sort(key=lambda group: files[group[0]][0] * (len(group) - 1), reverse=True)
+        print(f"Duplikatsuche: {self.stats['files']} Dateien, {self.stats['partial']} Teil-Hashes, "
+              f"{self.stats['full']} volle Hashes, {self.stats['cached']} nicht neu gelesen, {len(groups)} Gruppen")
+        return groups
+
+    def hash_stage(self, name, candidates, files, column, generation):
+        todo = []
+        for path in candidates:
+            if files[path][column] is not None:
+                self.stats["cached"] += 1
+            else:
+                todo.append(path)
+        total = len(todo)
+        self.progress.emit(name, 0, total)
+        if not todo:
+            return True
+
+        computed = []
+        with ThreadPoolExecutor(max_workers=DUPLICATE_HASH_THREAD_COUNT) as executor:
+            if column == 2:
+                futures = {executor.submit(partial_hash, path, files[path][0]): path for path in todo}
+            else:
+                futures = {executor.submit(full_hash, path): path for path in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                if generation != self.generation:
+                    for pending in futures:
+                        pending.cancel()
+                    return False
+                path = futures[future]
+                try:
+                    result = future.result()
+                except OSError as e:
+                    print(f"Fehler beim Lesen von {path}: {e}")
+                    continue
+                entry = files[path]
+                if column == 2:
+                    entry[2], complete = result
+                    self.stats["partial"] += 1
+                    if complete:
+                        entry[3] = entry[2]
+                else:
+                    entry[3] = result
+                    self.stats["full"] += 1
+                computed.append(path)
+                if done == total or done % 50 == 0:
+                    self.progress.emit(name, done, total)
+
+        # Nicht lesbare Dateien fallen raus, damit sie nicht als gleich gelten
+        candidates[:] = [path for path in candidates if files[path][column] is not None]
+        self.metadata_store.set_hashes([(path, *files[path]) for path in computed])
+        return True
@@ -0,0 +1,69 @@
+import struct
+
+# Liest nur Dateikopf und APP1-Segment einer JPEG-Datei, der Bildinhalt selbst wird nie angefasst.
+
+TAG_ORIENTATION = 0x0112
+TAG_THUMBNAIL_OFFSET = 0x0201
+TAG_THUMBNAIL_LENGTH = 0x0202
+
+MARKER_SOS = 0xDA
+MARKER_APP1 = 0xE1
+
+
+def read_app1_segment(f):
+    if f.read(2) != b"\xff\xd8":
+        return None
+    while True:
+        header = f.read(4)
+        if len(header) < 4 or header[0] != 0xFF:
+            return None
+        marker = header[1]
+        length = struct.unpack(">H", header[2:])[0]
+        if marker == MARKER_SOS:
+            return None  # Ab hier beginnen die Bilddaten
+        if marker == MARKER_APP1:
+            segment = f.read(length - 2)
+            if segment.startswith(b"Exif\x00\x00"):
+                return segment[6:]
+        else:
+            f.seek(length - 2, 1)
+
+
+def read_ifd(tiff, offset, byte_order):
+    entries = {}
+    count = struct.unpack_from(byte_order + "H", tiff, offset)[0]
+    for i in range(count):
+        tag, field_type, _, value = struct.unpack_from(byte_order + "HHII", tiff, offset + 2 + i * 12)
+        if field_type == 3:  # SHORT steht linksbündig im Wertefeld
+            value = struct.unpack_from(byte_order + "H", tiff, offset + 2 + i * 12 + 8)[0]
+        entries[tag] = value
+    next_offset = struct.unpack_from(byte_order + "I", tiff, offset + 2 + count * 12)[0]
+    return entries, next_offset
+
+
+def read_exif_thumbnail(path):
+    # Liefert (eingebettetes JPEG oder None, EXIF-Orientierung)
+    with open(path, "rb") as f:
+        tiff = read_app1_segment(f)
+    if not tiff or len(tiff) < 8:
+        return None, 1
+
+    byte_order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if byte_order is None:
+        return None, 1
+
+    try:
+        ifd0_offset = struct.unpack_from(byte_order + "I", tiff, 4)[0]
+        ifd0, ifd1_offset = read_ifd(tiff, ifd0_offset, byte_order)
+        orientation = ifd0.get(TAG_ORIENTATION, 1)
+        if not ifd1_offset:
+            return None, orientation
+        ifd1, _ = read_ifd(tiff, ifd1_offset, byte_order)
+    except struct.error:
+        return None, 1
+
+    offset = ifd1.get(TAG_THUMBNAIL_OFFSET)
+    length = ifd1.get(TAG_THUMBNAIL_LENGTH)
+    if not offset or not length or offset + length > len(tiff):
+        return None, orientation
+    return tiff[offset:offset + length], orientation
@@ -0,0 +1,150 @@
+import json
+import os
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from core.media_scanner import MediaScanner, scan_directory, scan_tree
+
+
+class FolderWatcher(QObject):
+    # Hält eine Momentaufnahme des Medienordners samt Unterordnern (Verzeichnis → Datei → [Größe, mtime])
+    # und meldet nur Unterschiede. Bei einer Änderung wird allein das betroffene Verzeichnis neu gelesen.
+    changed = pyqtSignal(list, list, list)  # neu, entfernt, geändert
+    reconciled = pyqtSignal()  # Vollständige Suche abgeschlossen
+
+    def __init__(self, snapshot_path, extensions, parent=None):
+        super().__init__(parent)
+        self.snapshot_path = snapshot_path
+        self.extensions = frozenset(ext.lower() for ext in extensions)
+        self.folder = None
+        self.snapshot = {}
+        self.dirty = set()
+        self.scanning = False
+        self.streaming = False
+
+        self.scanner = MediaScanner(self.extensions, self)
+        self.scanner.batch_found.connect(self.on_batch_found)
+        self.scanner.scan_finished.connect(self.on_scan_finished)
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_rescan)
+        # Kopiervorgänge lösen viele Meldungen aus, gelesen wird erst wenn Ruhe ist
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setSingleShot(True)
+        self.rescan_timer.setInterval(300)
+        self.rescan_timer.timeout.connect(self.rescan)
+
+    def watch(self, folder):
+        # Liefert sofort die Dateien der letzten Sitzung; Abweichungen folgen über changed.
+        # Ohne Momentaufnahme kommen die Dateien portionsweise, während die Suche noch läuft.
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        self.folder = folder
+        self.dirty.clear()
+        self.snapshot = self.load_snapshot(folder)
+        self.watch_directories(self.snapshot)
+
+        self.scanning = True
+        self.streaming = not self.snapshot
+        self.scanner.scan(folder)
+        return self.files()
+
+    def watch_directories(self, directories):
+        if directories:
+            self.watcher.addPaths(list(directories))
+
+    def files(self):
+        return [os.path.join(directory, name) for directory, entries in self.snapshot.items() for name in entries]
+
+    def is_current_scan(self, root, generation):
+        return root == self.folder and generation == self.scanner.generation
+
+    def on_batch_found(self, root, generation, paths):
+        if self.streaming and self.is_current_scan(root, generation):
+            self.changed.emit(paths, [], [])
+
+    def on_scan_finished(self, root, generation, directories):
+        if not self.is_current_scan(root, generation):
+            return
+        old = self.snapshot
+        self.snapshot = directories
+        self.scanning = False
+        self.watch_directories(set(directories) - set(old))
+
+        if not self.streaming:
+            added, removed, modified = self.diff(old, directories)
+            if added or removed or modified:
+                self.changed.emit(added, removed, modified)
+        self.save_snapshot()
+        self.reconciled.emit()
+        # Während der Suche gemeldete Änderungen jetzt gegen den neuen Stand prüfen
+        if self.dirty:
+            self.rescan_timer.start()
+
+    def diff(self, old, new):
+        added, removed, modified = [], [], []
+        for directory in set(old) | set(new):
+            old_entries = old.get(directory, {})
+            new_entries = new.get(directory, {})
+            for name, stat in new_entries.items():
+                if name not in old_entries:
+                    added.append(os.path.join(directory, name))
+                elif old_entries[name] != stat:
+                    modified.append(os.path.join(directory, name))
+            removed.extend(os.path.join(directory, name) for name in old_entries if name not in new_entries)
+        return added, removed, modified
+
+    def schedule_rescan(self, directory):
+        self.dirty.add(directory)
+        self.rescan_timer.start()
+
+    def rescan(self):
+        if self.scanning:
+            return
+        before = {}
+        after = {}
+        for directory in self.dirty:
+            if not os.path.isdir(directory):
+                before.update(self.forget_tree(directory))
+                continue
+            _, entries, subdirs = scan_directory(directory, self.extensions)
+            before[directory] = self.snapshot.get(directory, {})
+            after[directory] = entries
+            # Verschwundene Unterordner samt Inhalt austragen, neue komplett einlesen
+            for known in [d for d in self.snapshot if os.path.dirname(d) == directory and d not in subdirs]:
+                before.update(self.forget_tree(known))
+            for subdir in subdirs:
+                if subdir not in self.snapshot:
+                    after.update(scan_tree(subdir, self.extensions))
+        self.dirty.clear()
+
+        self.snapshot.update(after)
+        self.watch_directories(set(after) - set(before))
+        added, removed, modified = self.diff(before, after)
+        if added or removed or modified:
+            self.save_snapshot()
+            self.changed.emit(added, removed, modified)
+
+    def forget_tree(self, directory):
+        prefix = directory + os.sep
+        return {d: self.snapshot.pop(d) for d in list(self.snapshot) if d == directory or d.startswith(prefix)}
+
+    def load_snapshot(self, folder):
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, "r") as f:
+                    data = json.load(f)
+                if data.get("folder") == folder:
+                    return data["directories"]
+            except Exception as e:
+                print(f"Fehler beim Laden der Ordner-Momentaufnahme: {e}")
+        return {}
+
+    def save_snapshot(self):
+        temp_path = self.snapshot_path + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump({"folder": self.folder, "directories": self.snapshot}, f)
+            os.replace(temp_path, self.snapshot_path)
+        except Exception as e:
+            print(f"Fehler beim Speichern der Ordner-Momentaufnahme: {e}")
@@ -0,0 +1,92 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from core.common import SCAN_THREAD_COUNT, SCAN_BATCH_SIZE
+
+
+def scan_directory(directory, extensions):
+    # Ein Verzeichnis, nicht rekursiv: (Verzeichnis, {Datei: [Größe, mtime]}, Unterverzeichnisse)
+    # extensions ist ein Set aus Endungen in Kleinbuchstaben; versteckte Einträge (.thumbcache) bleiben außen vor
+    entries = {}
+    subdirs = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif os.path.splitext(name)[1].lower() in extensions:
+                    stat = entry.stat()
+                    entries[name] = [stat.st_size, stat.st_mtime_ns]
+    except OSError as e:
+        print(f"Fehler beim Lesen von {directory}: {e}")
+    return directory, entries, subdirs
+
+
+def scan_tree(root, extensions):
+    # Kleine Teilbäume (neu angelegte Unterordner) direkt im aufrufenden Thread
+    directories = {}
+    stack = [root]
+    while stack:
+        directory, entries, subdirs = scan_directory(stack.pop(), extensions)
+        directories[directory] = entries
+        stack.extend(subdirs)
+    return directories
+
+
+class MediaScanner(QObject):
+    # Durchsucht einen Ordnerbaum im Hintergrund; jedes Verzeichnis ist ein eigener Auftrag,
+    # so laufen Teilbäume parallel. Funde gehen in Portionen raus, solange die Suche noch läuft.
+    # Beide Signale nennen Wurzel und Suchlauf, bereits eingereihte Meldungen einer abgelösten Suche
+    # lassen sich so verwerfen
+    batch_found = pyqtSignal(str, int, list)  # Wurzel, Suchlauf, Pfade
+    scan_finished = pyqtSignal(str, int, dict)  # Wurzel, Suchlauf, Verzeichnis → {Datei: [Größe, mtime]}
+
+    def __init__(self, extensions, parent=None):
+        super().__init__(parent)
+        self.extensions = frozenset(ext.lower() for ext in extensions)
+        self.generation = 0
+
+    def scan(self, root):
+        # Eine neue Suche macht eine noch laufende ungültig
+        self.generation += 1
+        threading.Thread(target=self.run, args=(root, self.generation), name="MediaScanner", daemon=True).start()
+
+    def cancel(self):
+        self.generation += 1
+
+    def run(self, root, generation):
+        try:
+            directories = {}
+            batch = []
+            first = True
+            with ThreadPoolExecutor(max_workers=SCAN_THREAD_COUNT) as executor:
+                futures = {executor.submit(scan_directory, root, self.extensions)}
+                while futures:
+                    done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                    if generation != self.generation:
+                        for future in futures:
+                            future.cancel()
+                        return
+                    for future in done:
+                        directory, entries, subdirs = future.result()
+                        directories[directory] = entries
+                        batch.extend(os.path.join(directory, name) for name in entries)
+                        futures.update(executor.submit(scan_directory, subdir, self.extensions) for subdir in subdirs)
+                    # Die erste Portion sofort, damit das Grid ohne Wartezeit etwas zeigt
+                    if batch and (first or len(batch) >= SCAN_BATCH_SIZE):
+                        self.batch_found.emit(root, generation, batch)
+                        batch = []
+                        first = False
+            if generation != self.generation:
+                return
+            if batch:
+                self.batch_found.emit(root, generation, batch)
+            self.scan_finished.emit(root, generation, directories)
+        except Exception as e:
+            print(f"Fehler beim Durchsuchen von {root}: {e}")
@@ -0,0 +1,236 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+
+from PyQt5.QtCore import QObject, QTimer
+
+# Schlagwörter, Zeitbereiche, Lautstärken und Einstellungen in einer SQLite-Datei.
+# Jede Änderung betrifft nur ihre eigenen Zeilen, gesammelte Änderungen laufen als eine Transaktion;
+# im WAL-Modus bleibt die Datei auch bei einem Absturz mitten im Schreiben konsistent.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tags (path TEXT NOT NULL, tag TEXT NOT NULL, PRIMARY KEY (path, tag));
+CREATE INDEX IF NOT EXISTS tags_by_tag ON tags (tag);
+CREATE TABLE IF NOT EXISTS ranges (path TEXT PRIMARY KEY, start REAL NOT NULL, end REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS volumes (path TEXT PRIMARY KEY, volume INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS hashes (path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime INTEGER NOT NULL,
+                                   partial TEXT, full TEXT);
+"""
+
+# Bisherige JSON-Dateien, die beim ersten Öffnen einmalig übernommen werden
+LEGACY_TAGS_FILE = "media_tags.json"
+LEGACY_RANGES_FILE = "video_ranges.json"
+LEGACY_VOLUMES_FILE = "volume_settings.json"
+LEGACY_SETTINGS_FILE = "settings.json"
+LEGACY_SESSION_FILE = "session.json"
+
+
+def write_tags(connection, path, tag_string):
+    connection.execute("DELETE FROM tags WHERE path = ?", (path,))
+    connection.executemany("INSERT OR IGNORE INTO tags (path, tag) VALUES (?, ?)",
+                           [(path, tag) for tag in tag_string.split()])
+
+
+def write_range(connection, path, bounds):
+    if bounds is None:
+        connection.execute("DELETE FROM ranges WHERE path = ?", (path,))
+    else:
+        connection.execute("INSERT OR REPLACE INTO ranges (path, start, end) VALUES (?, ?, ?)",
+                           (path, bounds["start"], bounds["end"]))
+
+
+def write_volume(connection, path, volume):
+    connection.execute("INSERT OR REPLACE INTO volumes (path, volume) VALUES (?, ?)", (path, volume))
+
+
+def write_setting(connection, key, value):
+    connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+
+WRITERS = {
+    "tags": write_tags,
+    "range": write_range,
+    "volume": write_volume,
+    "setting": write_setting,
+}
+
+
+def read_json(path):
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Fehler beim Lesen von {path}: {e}")
+    return {}
+
+
+class MetadataStore:
+    def __init__(self, db_path, legacy_folder="."):
+        self.db_path = db_path
+        # Eine Verbindung für alle Threads, Zugriffe laufen über die Sperre
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+        if self.get_setting("json_imported") is None:
+            self.import_json_files(legacy_folder)
+
+    def import_json_files(self, folder):
+        # Die JSON-Dateien bleiben liegen, werden aber danach nicht mehr gelesen
+        tags = read_json(os.path.join(folder, LEGACY_TAGS_FILE))
+        ranges = read_json(os.path.join(folder, LEGACY_RANGES_FILE))
+        volumes = read_json(os.path.join(folder, LEGACY_VOLUMES_FILE))
+        settings = read_json(os.path.join(folder, LEGACY_SETTINGS_FILE))
+        session = read_json(os.path.join(folder, LEGACY_SESSION_FILE))
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO tags (path, tag) VALUES (?, ?)",
+                [(path, tag) for path, tag_string in tags.items() for tag in tag_string.split()])
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO ranges (path, start, end) VALUES (?, ?, ?)",
+                [(path, bounds["start"], bounds["end"]) for path, bounds in ranges.items()])
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO volumes (path, volume) VALUES (?, ?)", list(volumes.items()))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in settings.items()] +
+                ([("session", json.dumps(session))] if session else []) +
+                [("json_imported", json.dumps(True))])
+        if tags or ranges or volumes or settings:
+            print(f"Metadaten übernommen: {len(tags)} Tag-Einträge, {len(ranges)} Zeitbereiche, "
+                  f"{len(volumes)} Lautstärken")
+
+    def load_tags(self):
+        # Pfad → Schlagwörter als Text, wie bisher in media_tags.json
+        tags = {}
+        with self.lock:
+            for path, tag in self.connection.execute("SELECT path, tag FROM tags ORDER BY path, tag"):
+                tags[path] = tags[path] + " " + tag if path in tags else tag
+        return tags
+
+    def write_batch(self, changes):
+        # (Art, Schlüssel) → Wert, alles in einer Transaktion
+        with self.lock, self.connection:
+            for (kind, key), value in changes.items():
+                WRITERS[kind](self.connection, key, value)
+
+    def set_tags(self, path, tag_string):
+        self.write_batch({("tags", path): tag_string})
+
+    def load_ranges(self):
+        with self.lock:
+            rows = self.connection.execute("SELECT path, start, end FROM ranges").fetchall()
+        return {path: {"start": start, "end": end} for path, start, end in rows}
+
+    def set_range(self, path, bounds):
+        self.write_batch({("range", path): bounds})
+
+    def load_volumes(self):
+        with self.lock:
+            return dict(self.connection.execute("SELECT path, volume FROM volumes"))
+
+    def set_volume(self, path, volume):
+        self.write_batch({("volume", path): volume})
+
+    def get_setting(self, key, default=None):
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_setting(self, key, value):
+        self.write_batch({("setting", key): value})
+
+    def load_hashes(self, paths):
+        # Pfad → (Größe, mtime, Teil-Hash, voller Hash); ob der Eintrag noch gilt, prüft der Aufrufer
+        with self.lock:
+            rows = self.connection.execute("SELECT path, size, mtime, partial, full FROM hashes").fetchall()
+        return {row[0]: row[1:] for row in rows if row[0] in paths}
+
+    def set_hashes(self, rows):
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO hashes (path, size, mtime, partial, full) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def forget_hashes(self, paths):
+        with self.lock, self.connection:
+            self.connection.executemany("DELETE FROM hashes WHERE path = ?", [(path,) for path in paths])
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class MetadataWriter(QObject):
+    # Write-behind: Änderungen landen zuerst nur im Speicher, pro Zeile zählt der letzte Stand.
+    # Nach kurzer Wartezeit schreibt ein Hintergrund-Thread alles Gesammelte in einer Transaktion.
+    def __init__(self, store, delay_ms, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.pending = {}  # (Art, Schlüssel) → Wert
+        self.requested = 0
+        self.written = 0
+        self.flushes = 0
+
+        # Fenster ab der ersten Änderung statt Neustart bei jeder, so bleibt die Verzögerung begrenzt
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.flush)
+
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="MetadataWriter", daemon=True)
+        self.thread.start()
+
+    def mark(self, kind, key, value):
+        self.pending[(kind, key)] = value
+        self.requested += 1
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def set_tags(self, path, tag_string):
+        self.mark("tags", path, tag_string)
+
+    def set_range(self, path, bounds):
+        self.mark("range", path, bounds)
+
+    def set_volume(self, path, volume):
+        self.mark("volume", path, volume)
+
+    def set_setting(self, key, value):
+        self.mark("setting", key, value)
+
+    def flush(self):
+        self.timer.stop()
+        if self.pending:
+            self.queue.put(self.pending)
+            self.pending = {}
+
+    def run(self):
+        while True:
+            changes = self.queue.get()
+            try:
+                if changes is None:
+                    return
+                self.store.write_batch(changes)
+                self.written += len(changes)
+                self.flushes += 1
+            except Exception as e:
+                print(f"Fehler beim Schreiben der Metadaten: {e}")
+            finally:
+                self.queue.task_done()
+
+    def close(self):
+        # Letzter Stand muss vor dem Beenden auf der Platte sein
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+
+    def stats_text(self):
+        return (f"Metadaten: {self.requested} Änderungen, {self.written} Zeilen in {self.flushes} Transaktionen "
+                f"geschrieben ({self.requested - self.written} eingespart)")
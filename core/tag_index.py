@@ -0,0 +1,84 @@
+def parse_tags(tag_string):
+    return set(tag_string.strip().lower().split()) if tag_string else set()
+
+
+class TagIndex:
+    # Invertierter Index über die aktuellen Mediendateien: Schlagwort → Pfade.
+    # Wird bei jeder Tag-Änderung nachgeführt, Filter brauchen dann nur noch Mengenoperationen.
+    def __init__(self):
+        self.paths_by_tag = {}
+        self.tags_by_path = {}
+        self.untagged = set()
+
+    def rebuild(self, files, media_tags):
+        self.paths_by_tag = {}
+        self.tags_by_path = {}
+        self.untagged = set()
+        self.add_files(files, media_tags)
+
+    def add_files(self, paths, media_tags):
+        for path in paths:
+            if path in self.tags_by_path:
+                continue
+            tags = parse_tags(media_tags.get(path))
+            self.tags_by_path[path] = tags
+            if not tags:
+                self.untagged.add(path)
+            for tag in tags:
+                self.paths_by_tag.setdefault(tag, set()).add(path)
+
+    def remove_files(self, paths):
+        for path in paths:
+            if path in self.tags_by_path:
+                self.set_tags(path, "")
+                del self.tags_by_path[path]
+                self.untagged.discard(path)
+
+    def set_tags(self, path, tag_string):
+        # Liefert (hinzugekommene, weggefallene) Schlagwörter dieser Datei
+        if path not in self.tags_by_path:
+            return set(), set()
+        old = self.tags_by_path[path]
+        new = parse_tags(tag_string)
+        for tag in new - old:
+            self.paths_by_tag.setdefault(tag, set()).add(path)
+        for tag in old - new:
+            paths = self.paths_by_tag[tag]
+            paths.discard(path)
+            if not paths:
+                del self.paths_by_tag[tag]
+        self.tags_by_path[path] = new
+        if new:
+            self.untagged.discard(path)
+        else:
+            self.untagged.add(path)
+        return new - old, old - new
+
+    def count(self, tag):
+        return len(self.paths_by_tag.get(tag, ()))
+
+    def counts(self):
+        return {tag: len(paths) for tag, paths in self.paths_by_tag.items()}
+
+    def query(self, include=(), exclude=(), match_all=False):
+        # include verknüpft mit UND (match_all) oder ODER, exclude wird abgezogen (NICHT).
+        # Ohne include zählen alle Dateien als Ausgangsmenge.
+        if include:
+            sets = sorted((self.paths_by_tag.get(tag, set()) for tag in include), key=len)
+            if match_all:
+                result = set(sets[0]).intersection(*sets[1:])
+            else:
+                result = set().union(*sets)
+        else:
+            result = set(self.tags_by_path)
+        for tag in exclude:
+            result -= self.paths_by_tag.get(tag, set())
+        return result
+
+    def matches(self, path, include=(), exclude=(), match_all=False):
+        tags = self.tags_by_path.get(path, set())
+        if tags & set(exclude):
+            return False
+        if not include:
+            return True
+        return set(include) <= tags if match_all else bool(tags & set(include))
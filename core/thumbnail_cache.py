@@ -0,0 +1,510 @@
+import hashlib
+import json
+import os
+import queue
+import re
+import struct
+import threading
+import time
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QRunnable, QSize
+from PyQt5.QtGui import QImage, QImageReader
+
+# Aufbau einer Cache-Datei (eine pro Video):
+#   Magic "TPK1" | Anzahl Frames (uint32) | Offset-Tabelle (uint32 Offset, uint32 Länge) | JPEG-Daten
+PACK_MAGIC = b"TPK1"
+PACK_EXTENSION = ".thumbs"
+PACK_HEADER = struct.Struct("<4sI")
+PACK_ENTRY = struct.Struct("<II")
+
+LEGACY_FILE_PATTERN = re.compile(r"^([0-9a-f]{64})_(\d+)\.jpg$")
+
+# Manifest: Schlüssel -> {complete, frames, width, fingerprint}
+# Änderungen werden als einzelne Zeilen an das Journal angehängt und beim Start verdichtet.
+# Zugriffszeiten werden nur beim Verdichten mitgeschrieben, das Journal bleibt davon frei.
+MANIFEST_FILE = "manifest.json"
+MANIFEST_JOURNAL = "manifest.journal"
+
+FINGERPRINT_SAMPLE_SIZE = 64 * 1024
+
+
+def encode_jpeg(image, quality=-1):
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "JPEG", quality)
+    buffer.close()
+    return bytes(data)
+
+
+def decode_jpeg(blob, width=None):
+    if not width:
+        return QImage.fromData(blob, "JPEG")
+    # Kleinere Breiten direkt beim Dekodieren erzeugen (DCT-Skalierung des JPEG-Handlers)
+    buffer = QBuffer()
+    buffer.setData(blob)
+    buffer.open(QIODevice.ReadOnly)
+    reader = QImageReader(buffer, b"JPEG")
+    size = reader.size()
+    if size.isValid() and size.width() > width:
+        reader.setScaledSize(QSize(width, max(1, round(size.height() * width / size.width()))))
+    return reader.read()
+
+
+def jpeg_size(blob):
+    buffer = QBuffer()
+    buffer.setData(blob)
+    buffer.open(QIODevice.ReadOnly)
+    return QImageReader(buffer, b"JPEG").size()
+
+
+def write_pack(file_path, blobs):
+    table_size = PACK_HEADER.size + PACK_ENTRY.size * len(blobs)
+    offset = table_size
+    table = [PACK_HEADER.pack(PACK_MAGIC, len(blobs))]
+    for blob in blobs:
+        table.append(PACK_ENTRY.pack(offset, len(blob)))
+        offset += len(blob)
+
+    temp_path = file_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(b"".join(table))
+        for blob in blobs:
+            f.write(blob)
+    os.replace(temp_path, file_path)
+
+
+def read_pack_header(file_path):
+    with open(file_path, "rb") as f:
+        header = f.read(PACK_HEADER.size + PACK_ENTRY.size)
+        magic, count = PACK_HEADER.unpack_from(header, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"Ungültige Cache-Datei: {file_path}")
+        offset, length = PACK_ENTRY.unpack_from(header, PACK_HEADER.size)
+        f.seek(offset)
+        first_frame = f.read(length)
+    return count, first_frame
+
+
+def content_fingerprint(path):
+    # Günstiger Fingerabdruck: Größe, mtime und Hash über Anfang, Mitte und Ende der Datei
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if stat.st_size <= 3 * FINGERPRINT_SAMPLE_SIZE:
+            digest.update(f.read())
+        else:
+            for offset in (0, (stat.st_size - FINGERPRINT_SAMPLE_SIZE) // 2, stat.st_size - FINGERPRINT_SAMPLE_SIZE):
+                f.seek(offset)
+                digest.update(f.read(FINGERPRINT_SAMPLE_SIZE))
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns, "sample": digest.hexdigest()}
+
+
+def make_cache_key(fingerprint, bounds=None):
+    # Inhalt statt Pfad: umbenannte, verschobene und doppelte Dateien teilen sich einen Eintrag
+    raw = f"{fingerprint['size']}:{fingerprint['sample']}"
+    if bounds:
+        raw += f":{bounds.get('start', 0)}:{bounds.get('end', '')}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def read_pack(file_path):
+    # Ein einziger Lesezugriff, danach nur noch Slices im Speicher
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    magic, count = PACK_HEADER.unpack_from(data, 0)
+    if magic != PACK_MAGIC:
+        raise ValueError(f"Ungültige Cache-Datei: {file_path}")
+
+    blobs = []
+    for i in range(count):
+        offset, length = PACK_ENTRY.unpack_from(data, PACK_HEADER.size + i * PACK_ENTRY.size)
+        blobs.append(data[offset:offset + length])
+    return blobs
+
+
+class ThumbnailDiskCache:
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(self.folder, exist_ok=True)
+        self.manifest_path = os.path.join(self.folder, MANIFEST_FILE)
+        self.journal_path = os.path.join(self.folder, MANIFEST_JOURNAL)
+        self.lock = threading.Lock()
+        self.entries = {}  # Schlüssel -> Eintrag
+        self.paths = {}  # Pfad -> {key, size, mtime}
+        self.accessed = {}  # Schlüssel -> letzter Zugriff (Unix-Zeit)
+        self.load_manifest()
+
+    def pack_file(self, key):
+        return os.path.join(self.folder, key + PACK_EXTENSION)
+
+    def load_manifest(self):
+        data = None
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r") as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"Fehler beim Laden des Cache-Manifests: {e}")
+
+        if data is None:
+            self.entries = self.scan_packs()
+        elif "entries" in data:
+            self.entries = data["entries"]
+            self.paths = data["paths"]
+            self.accessed = data.get("accessed", {})
+        else:
+            self.entries = data  # Manifest ohne Pfadindex (Schlüssel = sha256 des Pfads)
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # abgebrochene letzte Zeile
+                    if "path" in record:
+                        self.apply(self.paths, record["path"], record["ref"])
+                    else:
+                        self.apply(self.entries, record["key"], record["entry"])
+
+        self.write_manifest()
+
+    def apply(self, target, name, value):
+        if value is None:
+            target.pop(name, None)
+        else:
+            target[name] = value
+
+    def write_manifest(self):
+        temp_path = self.manifest_path + ".tmp"
+        try:
+            with self.lock:
+                # json.dump läuft die Wörterbücher schrittweise ab, deshalb eine Kopie; die Sperre bleibt,
+                # damit zwischen Kopie und Löschen des Journals kein Eintrag verloren geht
+                snapshot = {"entries": dict(self.entries), "paths": dict(self.paths), "accessed": dict(self.accessed)}
+                with open(temp_path, "w") as f:
+                    json.dump(snapshot, f)
+                os.replace(temp_path, self.manifest_path)
+                if os.path.exists(self.journal_path):
+                    os.remove(self.journal_path)
+        except Exception as e:
+            print(f"Fehler beim Speichern des Cache-Manifests: {e}")
+
+    def scan_packs(self):
+        # Einmaliger Aufbau, falls noch kein Manifest existiert
+        entries = {}
+        for entry in os.scandir(self.folder):
+            if not entry.name.endswith(PACK_EXTENSION):
+                continue
+            try:
+                count, first_frame = read_pack_header(entry.path)
+                width = decode_jpeg(first_frame).width()
+            except Exception as e:
+                print(f"Fehler beim Lesen von {entry.name}: {e}")
+                continue
+            key = entry.name[:-len(PACK_EXTENSION)]
+            entries[key] = {"complete": True, "frames": count, "width": width, "fingerprint": None}
+        return entries
+
+    def journal(self, record):
+        with open(self.journal_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def record(self, key, entry):
+        with self.lock:
+            self.apply(self.entries, key, entry)
+            if entry is None:
+                self.accessed.pop(key, None)
+            self.journal({"key": key, "entry": entry})
+
+    def touch(self, key):
+        with self.lock:
+            self.accessed[key] = time.time()
+
+    def record_path(self, path, ref):
+        with self.lock:
+            self.apply(self.paths, path, ref)
+            self.journal({"path": path, "ref": ref})
+
+    def key_for(self, path):
+        ref = self.paths.get(path)
+        return ref["key"] if ref else None
+
+    def has_key(self, key, width):
+        # Breitere Einträge taugen auch, verkleinert wird bei der Anzeige
+        entry = self.entries.get(key)
+        return bool(entry and entry["complete"] and entry["width"] >= width)
+
+    def has(self, path, width):
+        # Reine Wörterbuchabfrage, kein Dateisystemzugriff
+        return self.has_key(self.key_for(path), width)
+
+    def is_current(self, path):
+        # Ein stat() pro Video: passt die Quelle noch zum gespeicherten Fingerabdruck?
+        ref = self.paths.get(path)
+        if not ref:
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        return stat.st_size == ref["size"] and stat.st_mtime_ns == ref["mtime"]
+
+    def resolve(self, path, bounds=None):
+        fingerprint = content_fingerprint(path)
+        key = make_cache_key(fingerprint, bounds)
+
+        # Einträge aus der Zeit, als der Schlüssel der Pfad-Hash war, übernehmen
+        legacy_key = hashlib.sha256(path.encode('utf-8')).hexdigest()
+        if key not in self.entries and legacy_key in self.entries and not bounds:
+            try:
+                os.replace(self.pack_file(legacy_key), self.pack_file(key))
+                entry = dict(self.entries[legacy_key], fingerprint=fingerprint)
+                self.record(legacy_key, None)
+                self.record(key, entry)
+            except OSError as e:
+                print(f"Fehler beim Übernehmen des Cache-Eintrags für {path}: {e}")
+
+        ref = {"key": key, "size": fingerprint["size"], "mtime": fingerprint["mtime"]}
+        if self.paths.get(path) != ref:
+            self.record_path(path, ref)
+        self.touch(key)
+        return key
+
+    def forget(self, path):
+        ref = self.paths.get(path)
+        if not ref:
+            return
+        self.record_path(path, None)
+        # Teilt sich keine andere Datei den Eintrag, kann er sofort weg
+        if not self.is_referenced(ref["key"]):
+            self.remove(ref["key"])
+
+    def is_referenced(self, key):
+        return any(ref["key"] == key for ref in list(self.paths.values()))
+
+    def load(self, key):
+        self.touch(key)
+        return read_pack(self.pack_file(key))
+
+    def store(self, path, blobs, width, complete=True):
+        ref = self.paths.get(path)
+        if not ref:
+            return
+        write_pack(self.pack_file(ref["key"]), blobs)
+        self.touch(ref["key"])
+        self.record(ref["key"], {
+            "complete": complete,
+            "frames": len(blobs),
+            "width": width,
+            "fingerprint": {"size": ref["size"], "mtime": ref["mtime"]},
+        })
+
+    def remove(self, key):
+        self.record(key, None)
+        pack = self.pack_file(key)
+        try:
+            if os.path.exists(pack):
+                os.remove(pack)
+        except OSError as e:
+            print(f"Fehler beim Entfernen von {pack}: {e}")
+
+    def migrate_legacy_layout(self):
+        # Alte Ablage: <sha>_<i>.jpg je Frame, alles lose im Cache-Verzeichnis
+        groups = {}
+        for entry in os.scandir(self.folder):
+            match = LEGACY_FILE_PATTERN.match(entry.name)
+            if match:
+                groups.setdefault(match.group(1), {})[int(match.group(2))] = entry.path
+
+        migrated = 0
+        for key, frames in groups.items():
+            indices = sorted(frames)
+            pack = os.path.join(self.folder, key + PACK_EXTENSION)
+            try:
+                # Nur lückenlose Sätze übernehmen; unvollständige galten schon bisher als Cache-Miss
+                if indices == list(range(len(indices))) and not os.path.exists(pack):
+                    blobs = []
+                    for i in indices:
+                        with open(frames[i], "rb") as f:
+                            blobs.append(f.read())
+                    write_pack(pack, blobs)
+                    self.record(key, {
+                        "complete": True,
+                        "frames": len(blobs),
+                        "width": decode_jpeg(blobs[0]).width(),
+                        "fingerprint": None,
+                    })
+                    migrated += 1
+                for file_path in frames.values():
+                    os.remove(file_path)
+            except OSError as e:
+                print(f"Fehler bei der Cache-Migration von {key}: {e}")
+
+        if migrated:
+            print(f"Thumbnail-Cache migriert: {migrated} Videos")
+        return migrated
+
+
+class CacheWriter:
+    # Eigener Schreib-Thread: Worker liefern fertig kodierte JPEGs, hier wird nur noch
+    # auf Platte geschrieben. Die Warteschlange ist begrenzt, volle Queue bremst die Worker.
+    def __init__(self, disk_cache, max_pending):
+        self.disk_cache = disk_cache
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(target=self.run, name="ThumbnailCacheWriter", daemon=True)
+        self.thread.start()
+
+    def submit(self, path, blobs, width):
+        self.queue.put((path, blobs, width))
+
+    def run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                path, blobs, width = job
+                self.disk_cache.store(path, blobs, width)
+            except Exception as e:
+                print(f"Fehler beim Schreiben des Thumbnail-Caches: {e}")
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        self.queue.join()
+
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+
+
+class CacheMaintenance:
+    # Räumt den Cache im Hintergrund auf: verwaiste Pfade und Einträge, liegengebliebene Dateien
+    # und zuletzt alles über der Größengrenze, am längsten nicht benutzte Einträge zuerst.
+    # Gearbeitet wird in kleinen Portionen mit Pausen, damit Vorschau-Jobs Vorrang haben.
+    BATCH_SIZE = 50
+
+    def __init__(self, disk_cache, max_bytes):
+        self.disk_cache = disk_cache
+        self.max_bytes = max_bytes
+        self.cancelled = False
+        self.thread = None
+
+    def start(self, known_paths):
+        if self.thread and self.thread.is_alive():
+            return
+        self.cancelled = False
+        self.thread = threading.Thread(target=self.run, args=(set(known_paths),),
+                                       name="ThumbnailCacheMaintenance", daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled = True
+        if self.thread:
+            self.thread.join()
+
+    def pause(self, index):
+        if index % self.BATCH_SIZE == self.BATCH_SIZE - 1:
+            time.sleep(0.05)
+        return self.cancelled
+
+    def run(self, known_paths):
+        try:
+            orphans = self.drop_missing_paths(known_paths)
+            removed, freed = self.drop_unreferenced()
+            evicted, evicted_bytes = self.enforce_size_limit()
+            if self.cancelled:
+                return
+            self.disk_cache.write_manifest()
+            if orphans or removed or evicted:
+                print(f"Thumbnail-Cache bereinigt: {orphans} verwaiste Pfade, {removed} verwaiste Einträge, "
+                      f"{evicted} verdrängt, {(freed + evicted_bytes) / 1024 / 1024:.0f} MB frei")
+        except Exception as e:
+            print(f"Fehler bei der Cache-Pflege: {e}")
+
+    def drop_missing_paths(self, known_paths):
+        # Bekannte Medien existieren; alle anderen Pfade einzeln prüfen (z.B. aus anderen Ordnern)
+        dropped = 0
+        for i, path in enumerate(list(self.disk_cache.paths)):
+            if self.pause(i):
+                break
+            if path not in known_paths and not os.path.exists(path):
+                self.disk_cache.record_path(path, None)
+                dropped += 1
+        return dropped
+
+    def drop_unreferenced(self):
+        referenced = {ref["key"] for ref in list(self.disk_cache.paths.values())}
+        # Alte Einträge (Schlüssel = Pfad-Hash, noch ohne Fingerabdruck) werden erst beim nächsten Zugriff
+        # übernommen, auch die aus anderen Ordnern. Sie sind keine Waisen, weichen nur der Größengrenze
+        referenced.update(key for key, entry in list(self.disk_cache.entries.items())
+                          if entry.get("fingerprint") is None)
+
+        removed = 0
+        freed = 0
+        for i, entry in enumerate(list(os.scandir(self.disk_cache.folder))):
+            if self.pause(i):
+                break
+            name = entry.name
+            if name.endswith(PACK_EXTENSION):
+                key = name[:-len(PACK_EXTENSION)]
+                # Erneut prüfen: der Pfadindex kann sich seit dem Schnappschuss geändert haben
+                if key in referenced or self.disk_cache.is_referenced(key):
+                    continue
+            elif not name.endswith(".tmp"):
+                continue  # Manifest, Journal und noch nicht migrierte Einzel-JPEGs
+            elif time.time() - entry.stat().st_mtime < 3600:
+                continue  # schreibt evtl. gerade noch jemand
+            else:
+                key = None
+            freed += entry.stat().st_size
+            if key:
+                self.disk_cache.remove(key)
+            else:
+                os.remove(entry.path)
+            removed += 1
+
+        # Einträge ohne Datei
+        for key in list(self.disk_cache.entries):
+            if key not in referenced and not os.path.exists(self.disk_cache.pack_file(key)):
+                self.disk_cache.record(key, None)
+        return removed, freed
+
+    def enforce_size_limit(self):
+        sizes = {}
+        for entry in os.scandir(self.disk_cache.folder):
+            if entry.name.endswith(PACK_EXTENSION):
+                sizes[entry.name[:-len(PACK_EXTENSION)]] = entry.stat().st_size
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return 0, 0
+
+        with self.disk_cache.lock:
+            accessed = dict(self.disk_cache.accessed)
+        evicted = 0
+        evicted_bytes = 0
+        for i, key in enumerate(sorted(sizes, key=lambda k: accessed.get(k, 0))):
+            if total <= self.max_bytes or self.pause(i):
+                break
+            # Die Pfadverweise bleiben; beim nächsten Anzeigen wird neu erzeugt
+            self.disk_cache.remove(key)
+            total -= sizes[key]
+            evicted += 1
+            evicted_bytes += sizes[key]
+        return evicted, evicted_bytes
+
+
+class CacheMigration(QRunnable):
+    def __init__(self, disk_cache):
+        super().__init__()
+        self.disk_cache = disk_cache
+
+    def run(self):
+        try:
+            self.disk_cache.migrate_legacy_layout()
+        except Exception as e:
+            print(f"Fehler bei der Cache-Migration: {e}")
@@ -0,0 +1,102 @@
+from collections import OrderedDict
+
+from PyQt5.QtGui import QPixmap
+
+from core.common import FRAME_RING_SIZE
+from core.thumbnail_cache import decode_jpeg, jpeg_size
+
+
+def frame_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+
+class FrameSequence:
+    # Frames bleiben als JPEG-Bytes im Speicher; dekodiert wird nur der Frame, der gerade
+    # angezeigt wird. Die zuletzt dekodierten landen in einem kleinen Ringpuffer.
+    # Die Bytes liegen in Cache-Breite vor, width ist die angezeigte Breite.
+    def __init__(self, blobs, width=None):
+        self.blobs = blobs
+        self.width = width
+        self.decoded = OrderedDict()  # Index → QPixmap
+
+    def __len__(self):
+        return len(self.blobs)
+
+    def __getitem__(self, index):
+        pixmap = self.decoded.get(index)
+        if pixmap is None:
+            pixmap = QPixmap.fromImage(decode_jpeg(self.blobs[index], self.width))
+            self.decoded[index] = pixmap
+            if len(self.decoded) > FRAME_RING_SIZE:
+                self.decoded.popitem(last=False)
+        return pixmap
+
+    def source_width(self):
+        return jpeg_size(self.blobs[0]).width()
+
+    def set_width(self, width):
+        self.width = width
+        self.decoded.clear()
+
+    @property
+    def nbytes(self):
+        return sum(len(blob) for blob in self.blobs) + sum(frame_bytes(p) for p in self.decoded.values())
+
+
+class ThumbnailMemoryCache:
+    # Pfad → Frames, begrenzt auf ein Byte-Budget. Verdrängt wird das am längsten nicht
+    # benutzte Video; Einträge im Sichtbereich sind geschützt. Verdrängtes kommt bei Bedarf
+    # wieder aus dem Plattencache.
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()  # Pfad → (Frames, Bytes)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path):
+        entry = self.entries.get(path)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(path)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, path, frames, protected=()):
+        self.discard(path)
+        size = frames.nbytes
+        self.entries[path] = (frames, size)
+        self.total_bytes += size
+        self.evict(protected)
+
+    def evict(self, protected=()):
+        for path in list(self.entries):
+            if self.total_bytes <= self.budget_bytes:
+                break
+            if path in protected:
+                continue
+            self.discard(path)
+            self.evictions += 1
+
+    def discard(self, path):
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def rescale(self, width):
+        # Neue Vorschaubreite: was breit genug vorliegt, bleibt und wird künftig kleiner dekodiert
+        for path, (frames, _) in list(self.entries.items()):
+            if frames.source_width() >= width:
+                frames.set_width(width)
+            else:
+                self.discard(path)
+
+    def stats_text(self):
+        return (f"Speicher: {self.total_bytes / 1024 / 1024:.0f} / {self.budget_bytes / 1024 / 1024:.0f} MB, "
+                f"Treffer {self.hits}, Fehlgriffe {self.misses}, verdrängt {self.evictions}")
@@ -0,0 +1,111 @@
+import heapq
+import itertools
+
+from PyQt5.QtCore import QObject, QRunnable
+
+from core.common import ThumbnailSignal, CancelToken
+
+
+class ScheduledJob(QRunnable):
+    def __init__(self, path, worker, token, signal):
+        super().__init__()
+        self.path = path
+        self.worker = worker
+        self.token = token
+        self.signal = signal
+
+    def run(self):
+        try:
+            if not self.token.cancelled:
+                self.worker.run()
+        finally:
+            self.signal.done.emit(self.path)
+
+
+class ThumbnailScheduler(QObject):
+    # Verteilt Vorschau-Jobs auf den Thread-Pool. Jobs warten hier statt in der Queue des Pools,
+    # damit sie beim Scrollen neu sortiert und beim Filtern verworfen werden können.
+    def __init__(self, thread_pool, parent=None):
+        super().__init__(parent)
+        self.thread_pool = thread_pool
+        # Ein Signal-Objekt für alle Jobs statt einem pro Job
+        self.signal = ThumbnailSignal()
+        self.signal.done.connect(self.on_job_done)
+
+        self.counter = itertools.count()
+        self.queue = []  # Heap aus (Priorität, Reihenfolge, Pfad)
+        self.pending = {}  # Pfad → (Priorität, Fabrik)
+        self.running = {}  # Pfad → CancelToken
+        self.follow_ups = {}  # Pfad → (Priorität, Fabrik), startet nach dem laufenden Job
+
+    def request(self, path, priority, factory, requeue=False):
+        # factory(signal, token) erzeugt den eigentlichen Worker erst beim Start
+        if path in self.running:
+            # Ein abgebrochener Job liefert nichts mehr, die Anfrage muss nach ihm neu starten
+            if requeue or self.running[path].cancelled:
+                self.running[path].cancel()
+                self.follow_ups[path] = (priority, factory)
+            return
+        if path in self.pending and not requeue:
+            self.reprioritize(path, priority)
+            return
+        self.pending[path] = (priority, factory)
+        heapq.heappush(self.queue, (priority, next(self.counter), path))
+        self.dispatch()
+
+    def reprioritize(self, path, priority):
+        current, factory = self.pending[path]
+        if current != priority:
+            self.pending[path] = (priority, factory)
+            heapq.heappush(self.queue, (priority, next(self.counter), path))
+
+    def retain(self, paths):
+        # Nur diese Pfade bleiben relevant, in dieser Reihenfolge; alles andere wird abgebrochen
+        ranks = {path: rank for rank, path in enumerate(paths)}
+        cancelled = []
+        for path in list(self.pending):
+            if path in ranks:
+                self.reprioritize(path, ranks[path])
+            else:
+                del self.pending[path]
+                cancelled.append(path)
+        for path, token in self.running.items():
+            if path not in ranks and not token.cancelled:
+                token.cancel()
+                self.follow_ups.pop(path, None)
+                cancelled.append(path)
+        self.compact()
+        return cancelled
+
+    def cancel_all(self):
+        self.pending.clear()
+        self.queue.clear()
+        self.follow_ups.clear()
+        for token in self.running.values():
+            token.cancel()
+
+    def compact(self):
+        # Verwaiste Heap-Einträge (verworfen oder umsortiert) entfernen, damit der Heap nicht wächst
+        if len(self.queue) > 2 * len(self.pending) + 16:
+            self.queue = [(priority, order, path) for priority, order, path in self.queue
+                          if path in self.pending and self.pending[path][0] == priority]
+            heapq.heapify(self.queue)
+
+    def dispatch(self):
+        while self.queue and len(self.running) < self.thread_pool.maxThreadCount():
+            priority, _, path = heapq.heappop(self.queue)
+            entry = self.pending.get(path)
+            if entry is None or entry[0] != priority or path in self.running:
+                continue
+            del self.pending[path]
+            token = CancelToken()
+            self.running[path] = token
+            worker = entry[1](self.signal, token)
+            self.thread_pool.start(ScheduledJob(path, worker, token, self.signal))
+
+    def on_job_done(self, path):
+        self.running.pop(path, None)
+        follow_up = self.follow_ups.pop(path, None)
+        if follow_up:
+            self.request(path, *follow_up)
+        self.dispatch()
@@ -0,0 +1,134 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from core.common import SUPPORTED_IMAGES, SUPPORTED_VIDEOS, THUMBNAIL_MASTER_WIDTH, THUMBNAIL_PROCESS_COUNT
+from core.media_scanner import scan_tree
+from core.metadata_store import MetadataStore
+from core.thumbnail_cache import ThumbnailDiskCache
+from ui.image_thumbnail_loader import generate_encoded_image
+from ui.video_thumbnail_loader import generate_encoded_frames
+
+# Erzeugt den Vorschau-Cache ohne GUI, z.B. nachts auf dem Ingest-Server:
+#   python prewarm.py /pfad/zu/medien [/weitere/ordner ...]
+# Bereits vorhandene Einträge werden übersprungen, ein Abbruch verliert also nur die laufenden Dateien.
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Thumbnail-Cache für Medienordner vorab erzeugen")
+    parser.add_argument("folders", nargs="+", help="Medienordner (rekursiv)")
+    parser.add_argument("--cache", default=os.path.join(os.getcwd(), ".thumbcache"),
+                        help="Cache-Verzeichnis (Standard: .thumbcache im aktuellen Verzeichnis wie die GUI)")
+    parser.add_argument("--metadata", default="metadata.db", help="Metadaten der GUI (für die Zeitbereiche der Videos)")
+    parser.add_argument("--width", type=int, default=THUMBNAIL_MASTER_WIDTH, help="Breite der Vorschauen")
+    parser.add_argument("--workers", type=int, default=THUMBNAIL_PROCESS_COUNT, help="Anzahl Prozesse")
+    return parser.parse_args()
+
+
+def find_media(folders):
+    # Dieselbe Suche wie in der GUI (versteckte Dateien und Ordner wie .thumbcache bleiben außen vor).
+    # Absolute Pfade, damit die Pfadverweise im Manifest zu denen der GUI passen
+    extensions = frozenset(SUPPORTED_IMAGES + SUPPORTED_VIDEOS)
+    for folder in folders:
+        directories = scan_tree(os.path.abspath(folder), extensions)
+        for directory in sorted(directories):
+            for name in sorted(directories[directory]):
+                yield os.path.join(directory, name)
+
+
+def submit(process_pool, path, width, bounds):
+    if path.lower().endswith(SUPPORTED_IMAGES):
+        return process_pool.submit(generate_encoded_image, path, width)
+    return process_pool.submit(generate_encoded_frames, path, width, bounds)
+
+
+def prewarm(args):
+    disk_cache = ThumbnailDiskCache(args.cache)
+    metadata_store = MetadataStore(args.metadata, os.path.dirname(os.path.abspath(args.metadata)))
+    video_ranges = metadata_store.load_ranges()
+    metadata_store.close()
+    files = list(find_media(args.folders))
+    total = len(files)
+    print(f"{total} Mediendateien gefunden, {args.workers} Prozesse, Breite {args.width}")
+
+    skipped = 0
+    done = 0
+    failed = 0
+    frames = 0
+    started = time.monotonic()
+    pending = {}  # Future → (Schlüssel, Pfade)
+    in_flight = {}  # Schlüssel → Future; inhaltsgleiche Dateien (Kopien) hängen sich an den laufenden Auftrag
+
+    def report(path):
+        elapsed = max(time.monotonic() - started, 0.001)
+        print(f"[{skipped + done + failed}/{total}] {os.path.basename(path)} – "
+              f"{done / elapsed:.1f} Dateien/s, {frames / elapsed:.0f} Frames/s")
+
+    def collect(futures):
+        nonlocal done, failed, frames
+        for future in futures:
+            key, paths = pending.pop(future)
+            del in_flight[key]
+            path = paths[0]
+            try:
+                blobs = future.result()
+            except Exception as e:
+                print(f"Fehler bei {path}: {e}")
+                failed += len(paths)
+                continue
+            if not blobs:
+                print(f"Keine Frames für {path}")
+                failed += len(paths)
+                continue
+            # Geschrieben wird nur hier im Elternprozess, die Kinder liefern nur Bytes.
+            # Ein Eintrag genügt für alle Pfade, ihre Verweise zeigen auf denselben Schlüssel
+            disk_cache.store(path, blobs, args.width)
+            done += len(paths)
+            frames += len(blobs)
+            report(path)
+
+    process_pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        for path in files:
+            try:
+                bounds = video_ranges.get(path)
+                key = disk_cache.resolve(path, bounds)
+            except OSError as e:
+                print(f"Fehler bei {path}: {e}")
+                failed += 1
+                continue
+            if disk_cache.has_key(key, args.width):
+                skipped += 1
+                continue
+            if key in in_flight:
+                pending[in_flight[key]][1].append(path)
+                continue
+            # Nur wenige Dateien gleichzeitig in Arbeit, damit die Ergebnisse den Speicher nicht füllen
+            while len(pending) >= 2 * args.workers:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+            future = submit(process_pool, path, args.width, bounds)
+            pending[future] = (key, [path])
+            in_flight[key] = future
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(finished)
+    except KeyboardInterrupt:
+        print("Abgebrochen – erneuter Aufruf setzt an dieser Stelle fort")
+        process_pool.shutdown(wait=False, cancel_futures=True)
+        return 1
+    finally:
+        process_pool.shutdown(wait=True)
+        disk_cache.write_manifest()
+
+    elapsed = time.monotonic() - started
+    print(f"Fertig in {elapsed:.1f}s: {done} erzeugt, {skipped} bereits im Cache, {failed} fehlgeschlagen, "
+          f"{frames / max(elapsed, 0.001):.0f} Frames/s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(prewarm(parse_args()))
@@ -0,0 +1,53 @@
+from PyQt5.QtCore import QObject, QTimer, QElapsedTimer, Qt, pyqtSignal
+
+from core.common import ANIMATION_MAX_SLOWDOWN, ANIMATION_RECOVER_TICKS
+
+
+class AnimationClock(QObject):
+    # Ein Takt für alle animierten Vorschauen. Kommt der Takt zu spät oder braucht ein Tick
+    # zu lange, wird das Intervall verdoppelt; nach einer Reihe pünktlicher Ticks wieder verkürzt.
+    tick = pyqtSignal()
+
+    def __init__(self, interval, parent=None):
+        super().__init__(parent)
+        self.base_interval = interval
+        self.interval = interval
+        self.paused = True
+        self.on_time_ticks = 0
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.CoarseTimer)
+        self.timer.timeout.connect(self.on_timeout)
+        self.since_last_tick = QElapsedTimer()
+
+    def set_paused(self, paused):
+        if paused == self.paused:
+            return
+        self.paused = paused
+        if paused:
+            self.timer.stop()
+        else:
+            self.since_last_tick.start()
+            self.timer.start(self.interval)
+
+    def on_timeout(self):
+        late = self.since_last_tick.restart() - self.interval
+        work = QElapsedTimer()
+        work.start()
+        self.tick.emit()
+        self.adapt(late, work.elapsed())
+
+    def adapt(self, late, cost):
+        if late > self.interval // 2 or cost > self.interval // 2:
+            interval = min(self.interval * 2, self.base_interval * ANIMATION_MAX_SLOWDOWN)
+            self.on_time_ticks = 0
+        else:
+            self.on_time_ticks += 1
+            if self.on_time_ticks < ANIMATION_RECOVER_TICKS or self.interval == self.base_interval:
+                return
+            interval = max(self.base_interval, self.interval * 3 // 4)
+            self.on_time_ticks = 0
+
+        if interval != self.interval:
+            self.interval = interval
+            self.timer.setInterval(interval)
@@ -1,19 +1,23 @@
-import os
-
 from PyQt5.QtCore import QRunnable
 from PyQt5.QtGui import QPixmap
 
+from core.thumbnail_cache import read_pack
+
 
 class CachedThumbnailLoader(QRunnable):
-    def __init__(self, path, cache_files, signal):
+    def __init__(self, path, cache_file, signal):
         super().__init__()
         self.path = path
-        self.cache_files = cache_files
+        self.cache_file = cache_file
         self.signal = signal
 
     def run(self):
         try:
-            frames = [QPixmap(f) for f in self.cache_files if os.path.exists(f)]
+            frames = []
+            for blob in read_pack(self.cache_file):
+                pixmap = QPixmap()
+                if pixmap.loadFromData(blob, "JPEG"):
+                    frames.append(pixmap)
             if frames:
                 self.signal.finished.emit(self.path, frames)
         except Exception as e:
@@ -0,0 +1,106 @@
+from PyQt5.QtCore import QRunnable, QSize, Qt
+from PyQt5.QtGui import QImageReader, QImageIOHandler, QTransform
+
+from core.common import CancelToken
+from core.exif_thumbnail import read_exif_thumbnail
+from core.thumbnail_cache import decode_jpeg, encode_jpeg
+
+# EXIF-Orientierung → (horizontal spiegeln, Drehung im Uhrzeigersinn)
+EXIF_ORIENTATIONS = {
+    2: (True, 0),
+    3: (False, 180),
+    4: (True, 180),
+    5: (True, 270),
+    6: (False, 90),
+    7: (True, 90),
+    8: (False, 270),
+}
+
+
+def apply_exif_orientation(image, orientation):
+    mirror, angle = EXIF_ORIENTATIONS.get(orientation, (False, 0))
+    if mirror:
+        image = image.mirrored(True, False)
+    if angle:
+        image = image.transformed(QTransform().rotate(angle))
+    return image
+
+
+def load_exif_preview(path, width):
+    # Schnelle Erstanzeige aus dem eingebetteten EXIF-Vorschaubild, None wenn keins vorhanden ist
+    blob, orientation = read_exif_thumbnail(path)
+    if not blob:
+        return None
+    image = decode_jpeg(blob)
+    if image.isNull():
+        return None
+    return apply_exif_orientation(image, orientation).scaledToWidth(width, Qt.FastTransformation)
+
+
+def load_image_thumbnail(path, width):
+    # Verkleinert bereits beim Dekodieren; der JPEG-Handler von Qt nutzt dafür die DCT-Skalierung
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid():
+        # setScaledSize wirkt vor der EXIF-Drehung, maßgeblich ist aber die angezeigte Breite
+        rotated = bool(reader.transformation() & QImageIOHandler.TransformationRotate90)
+        shown_width = size.height() if rotated else size.width()
+        if shown_width > width:
+            factor = width / shown_width
+            reader.setScaledSize(QSize(max(1, round(size.width() * factor)), max(1, round(size.height() * factor))))
+
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(reader.errorString())
+    if image.width() != width:
+        image = image.scaledToWidth(width, Qt.SmoothTransformation)
+    return image
+
+
+def generate_encoded_image(path, width):
+    # Einstiegspunkt für den Prozess-Pool, Gegenstück zu generate_encoded_frames
+    return [encode_jpeg(load_image_thumbnail(path, width))]
+
+
+class ImageThumbnailLoader(QRunnable):
+    def __init__(self, path, thumb_size, signal, disk_cache, cache_writer, token=None, preview_width=None):
+        super().__init__()
+        self.path = path
+        self.thumb_size = thumb_size
+        self.preview_width = preview_width
+        self.signal = signal
+        self.disk_cache = disk_cache
+        self.cache_writer = cache_writer
+        self.token = token or CancelToken()
+
+    def run(self):
+        try:
+            key = self.disk_cache.resolve(self.path)
+            if self.disk_cache.has_key(key, self.thumb_size):
+                blobs = self.disk_cache.load(key)
+                if blobs:
+                    self.signal.finished.emit(self.path, blobs)
+                    return
+
+            if self.token.cancelled:
+                return
+            # Bis das Bild verkleinert ist, das eingebettete EXIF-Vorschaubild zeigen
+            if self.preview_width and self.path.lower().endswith(('.jpg', '.jpeg')):
+                self.emit_exif_preview()
+                if self.token.cancelled:
+                    return
+            blob = encode_jpeg(load_image_thumbnail(self.path, self.thumb_size))
+            self.signal.finished.emit(self.path, [blob])
+            self.cache_writer.submit(self.path, [blob], self.thumb_size)
+        except Exception as e:
+            print(f"Fehler beim Laden der Bildvorschau {self.path}: {e}")
+
+    def emit_exif_preview(self):
+        try:
+            image = load_exif_preview(self.path, self.preview_width)
+        except Exception as e:
+            print(f"Fehler beim Lesen des EXIF-Vorschaubilds {self.path}: {e}")
+            return
+        if image is not None:
+            self.signal.preview.emit(self.path, image)
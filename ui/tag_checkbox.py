@@ -0,0 +1,19 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QCheckBox
+
+
+class TagCheckBox(QCheckBox):
+    # Klick: einschließen, zweiter Klick: ausschließen (halb markiert), dritter: aus.
+    # Qt würde bei drei Zuständen zuerst halb markieren, der erste Klick soll aber wie bisher filtern
+    NEXT_STATE = {
+        Qt.Unchecked: Qt.Checked,
+        Qt.Checked: Qt.PartiallyChecked,
+        Qt.PartiallyChecked: Qt.Unchecked,
+    }
+
+    def __init__(self, text, parent=None):
+        super().__init__(text, parent)
+        self.setTristate(True)
+
+    def nextCheckState(self):
+        self.setCheckState(self.NEXT_STATE[self.checkState()])
@@ -0,0 +1,197 @@
+import os
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt, QSize, QRect, QPoint, QTimer, pyqtSignal
+from PyQt5.QtGui import QPen, QColor
+from PyQt5.QtWidgets import QListView, QStyledItemDelegate, QStyle
+
+from core.common import GRID_SPACING, GRID_PRELOAD_ROWS
+
+PATH_ROLE = Qt.UserRole + 1
+
+
+class ThumbnailGridModel(QAbstractListModel):
+    # Hält nur die Pfadliste; Frames existieren ausschließlich für Zellen im oder nahe dem Sichtbereich
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.paths = []
+        self.rows = {}
+        self.frames = {}  # Pfad → FrameSequence (oder Liste von QPixmaps für EXIF-Vorschauen)
+        self.frame_positions = {}
+
+    def set_paths(self, paths):
+        self.beginResetModel()
+        self.paths = list(paths)
+        self.rows = {path: row for row, path in enumerate(self.paths)}
+        self.frames.clear()
+        self.frame_positions.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        path = self.paths[index.row()]
+        if role == PATH_ROLE:
+            return path
+        if role == Qt.DecorationRole:
+            frames = self.frames.get(path)
+            return frames[self.frame_positions.get(path, 0)] if frames else None
+        if role == Qt.ToolTipRole:
+            return os.path.basename(path)
+        return None
+
+    def insert_paths(self, paths):
+        paths = [path for path in paths if path not in self.rows]
+        if not paths:
+            return
+        first = len(self.paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(paths) - 1)
+        for path in paths:
+            self.rows[path] = len(self.paths)
+            self.paths.append(path)
+        self.endInsertRows()
+
+    def remove_paths(self, paths):
+        # Von hinten entfernen, damit die vorher ermittelten Zeilennummern gültig bleiben
+        rows = sorted((self.rows[path] for path in paths if path in self.rows), reverse=True)
+        for row in rows:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self.drop_frames(self.paths.pop(row))
+            self.endRemoveRows()
+        if rows:
+            self.rows = {path: row for row, path in enumerate(self.paths)}
+
+    def has_frames(self, path):
+        return path in self.frames
+
+    def loaded_paths(self):
+        return list(self.frames)
+
+    def set_frames(self, path, frames):
+        row = self.rows.get(path)
+        if row is None:
+            return
+        self.frames[path] = frames
+        self.frame_positions[path] = 0
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def drop_frames(self, path):
+        self.frames.pop(path, None)
+        self.frame_positions.pop(path, None)
+
+    def advance_frames(self, first, last):
+        changed = False
+        for row in range(first, last):
+            path = self.paths[row]
+            frames = self.frames.get(path)
+            if frames and len(frames) > 1:
+                self.frame_positions[path] = (self.frame_positions[path] + 1) % len(frames)
+                changed = True
+        if changed:
+            self.dataChanged.emit(self.index(first), self.index(last - 1), [Qt.DecorationRole])
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    def __init__(self, thumb_width, parent=None):
+        super().__init__(parent)
+        self.thumb_width = thumb_width
+
+    def cell_size(self):
+        return QSize(self.thumb_width, self.thumb_width * 3 // 4)
+
+    def sizeHint(self, option, index):
+        return self.cell_size()
+
+    def paint(self, painter, option, index):
+        cell = QRect(QPoint(0, 0), self.cell_size())
+        cell.moveCenter(option.rect.center())
+        pixmap = index.data(Qt.DecorationRole)
+
+        painter.save()
+        if pixmap is None or pixmap.isNull():
+            target = cell
+            painter.drawText(cell, Qt.AlignCenter, "Lade...")
+        else:
+            size = pixmap.size()
+            if size.width() > cell.width() or size.height() > cell.height():
+                size = size.scaled(cell.size(), Qt.KeepAspectRatio)
+            target = QRect(QPoint(0, 0), size)
+            target.moveCenter(cell.center())
+            painter.drawPixmap(target, pixmap)
+
+        if option.state & QStyle.State_Selected:
+            painter.setPen(QPen(QColor("red"), 2))
+            painter.drawRect(target.adjusted(1, 1, -1, -1))
+        painter.restore()
+
+
+class ThumbnailGridView(QListView):
+    # Meldet die Pfade im Sichtbereich (plus Vorlauf), damit nur diese Frames geladen werden
+    visible_paths_changed = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setWrapping(True)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QListView.SingleSelection)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+
+        self.visible_timer = QTimer(self)
+        self.visible_timer.setSingleShot(True)
+        self.visible_timer.setInterval(50)
+        self.visible_timer.timeout.connect(self.emit_visible_paths)
+        self.verticalScrollBar().valueChanged.connect(self.schedule_visible_update)
+
+    def setModel(self, model):
+        super().setModel(model)
+        model.modelReset.connect(self.schedule_visible_update)
+        model.rowsInserted.connect(self.schedule_visible_update)
+        model.rowsRemoved.connect(self.schedule_visible_update)
+
+    def set_cell_width(self, width):
+        self.itemDelegate().thumb_width = width
+        cell = self.itemDelegate().cell_size()
+        self.setGridSize(QSize(cell.width() + GRID_SPACING, cell.height() + GRID_SPACING))
+        self.schedule_visible_update()
+
+    def set_animation_clock(self, clock):
+        clock.tick.connect(self.advance_visible_frames)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_visible_update()
+
+    def schedule_visible_update(self):
+        self.visible_timer.start()
+
+    def visible_row_range(self, margin_rows=0):
+        count = self.model().rowCount() if self.model() else 0
+        grid = self.gridSize()
+        if count == 0 or grid.isEmpty():
+            return 0, 0
+        columns = max(1, self.viewport().width() // grid.width())
+        offset = self.verticalScrollBar().value()
+        first_row = max(0, offset // grid.height() - margin_rows)
+        last_row = (offset + self.viewport().height()) // grid.height() + margin_rows
+        return min(count, first_row * columns), min(count, (last_row + 1) * columns)
+
+    def emit_visible_paths(self):
+        # Sichtbare Zeilen zuerst, danach der Vorlauf darunter und darüber
+        paths = self.model().paths
+        first, last = self.visible_row_range()
+        preload_first, preload_last = self.visible_row_range(GRID_PRELOAD_ROWS)
+        self.visible_paths_changed.emit(
+            paths[first:last] + paths[last:preload_last] + paths[preload_first:first][::-1])
+
+    def advance_visible_frames(self):
+        if not self.isVisible():
+            return
+        first, last = self.visible_row_range()
+        if last > first:
+            self.model().advance_frames(first, last)
@@ -1,53 +1,181 @@
+import os
+import time
+from concurrent.futures import TimeoutError
+
 import cv2
-from PyQt5.QtCore import QRunnable, Qt
-from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtCore import QRunnable
+
+from core.common import CancelToken, FRAMES_PER_THUMBNAIL, FLUEND, FLUEND_STEPS, SEQUENTIAL_MAX_STEP, BENCHMARK_FRAME_EXTRACTION
+
+
+def scale_frame(frame, width):
+    # Verkleinern noch im BGR-Format, bevor irgendetwas nach Qt konvertiert wird
+    height, frame_width = frame.shape[:2]
+    if frame_width == width:
+        return frame
+    new_height = max(1, round(height * width / frame_width))
+    interpolation = cv2.INTER_AREA if width < frame_width else cv2.INTER_CUBIC
+    return cv2.resize(frame, (width, new_height), interpolation=interpolation)
+
+
+def encode_frame(frame, quality=75):
+    success, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not success:
+        raise ValueError("JPEG-Kodierung fehlgeschlagen")
+    return buffer.tobytes()
+
+
+def read_frames_sequential(cap, start_frame, end_frame, step, transform=None, token=None):
+    # Einmal auf den Bereichsanfang springen, danach nur noch vorwärts lesen.
+    # grab() überspringt nicht benötigte Frames ohne Farbkonvertierung,
+    # retrieve() wird nur für die tatsächlich verwendeten Frames aufgerufen.
+    if start_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    frames = []
+    for i in range(start_frame, end_frame):
+        if token is not None and token.cancelled:
+            break
+        if not cap.grab():
+            break
+        if (i - start_frame) % step:
+            continue
+        success, frame = cap.retrieve()
+        if success and frame is not None:
+            frames.append(transform(frame) if transform else frame)
+    return frames
+
+
+def read_frames_seeking(cap, start_frame, end_frame, step, transform=None, token=None):
+    # Alter Pfad: vor jedem Frame neu positionieren
+    frames = []
+    for i in range(start_frame, end_frame, step):
+        if token is not None and token.cancelled:
+            break
+        cap.set(cv2.CAP_PROP_POS_FRAMES, i)
+        success, frame = cap.read()
+        if not success or frame is None:
+            continue
+        frames.append(transform(frame) if transform else frame)
+    return frames
+
+
+def read_frames(cap, start_frame, end_frame, step, transform=None, token=None):
+    # Bei sehr großen Abständen ist ein Sprung billiger als alle Frames dazwischen zu dekodieren
+    if step > SEQUENTIAL_MAX_STEP:
+        return read_frames_seeking(cap, start_frame, end_frame, step, transform, token)
+    return read_frames_sequential(cap, start_frame, end_frame, step, transform, token)
+
+
+def compare_frame_extraction(path, start_frame, end_frame, step, transform=None):
+    timings = {}
+    for name, reader in (("sequentiell", read_frames_sequential), ("seek", read_frames_seeking)):
+        cap = cv2.VideoCapture(path)
+        t0 = time.perf_counter()
+        count = len(reader(cap, start_frame, end_frame, step, transform))
+        timings[name] = (time.perf_counter() - t0, count)
+        cap.release()
+
+    seq_time, seq_count = timings["sequentiell"]
+    seek_time, seek_count = timings["seek"]
+    speedup = seek_time / seq_time if seq_time else 0
+    print(f"Frame-Extraktion {os.path.basename(path)}: "
+          f"sequentiell {seq_time * 1000:.0f} ms ({seq_count} Frames), "
+          f"seek {seek_time * 1000:.0f} ms ({seek_count} Frames), Faktor {speedup:.1f}x")
+    return timings
 
-from core.common import FRAMES_PER_THUMBNAIL, FLUEND, FLUEND_STEPS
+
+def generate_video_frames(path, width, bounds, token=None):
+    # Reine cv2-Funktion ohne Qt-Objekte, läuft im Thread- wie im Prozess-Backend
+    cap = cv2.VideoCapture(path)
+    try:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        duration = frame_count / fps if fps else 0
+        if frame_count <= 0 or duration <= 0:
+            return []
+
+        start_sec = bounds.get("start", 0) if bounds else 0
+        end_sec = bounds.get("end", duration) if bounds else duration
+        start_frame = int(start_sec * fps)
+        end_frame = int(end_sec * fps)
+        step = max((end_frame - start_frame) // FRAMES_PER_THUMBNAIL, 1)
+
+        if (FLUEND):
+            step =FLUEND_STEPS
+            end_frame=start_frame+FRAMES_PER_THUMBNAIL
+
+        def transform(frame):
+            return scale_frame(frame, width)
+
+        if BENCHMARK_FRAME_EXTRACTION:
+            compare_frame_extraction(path, start_frame, end_frame, step, transform)
+
+        # Jeder Frame wird direkt nach dem Dekodieren verkleinert, volle Auflösung wird nie gesammelt
+        return read_frames(cap, start_frame, end_frame, step, transform, token)
+    finally:
+        cap.release()
+
+
+def generate_encoded_frames(path, width, bounds):
+    # Einstiegspunkt für den Prozess-Pool: nur JPEG-Bytes gehen zurück über die Prozessgrenze
+    return [encode_frame(f) for f in generate_video_frames(path, width, bounds)]
 
 
 class VideoThumbnailLoader(QRunnable):
-    def __init__(self, path, thumb_size, signal, video_ranges):
+    def __init__(self, path, thumb_size, signal, video_ranges, disk_cache, cache_writer, token=None):
         super().__init__()
         self.path = path
         self.thumb_size = thumb_size
         self.signal = signal
         self.video_ranges = video_ranges
+        self.disk_cache = disk_cache
+        self.cache_writer = cache_writer
+        self.token = token or CancelToken()
 
     def run(self):
         try:
-            cap = cv2.VideoCapture(self.path)
-            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            duration = frame_count / fps if fps else 0
-            if frame_count <= 0 or duration <= 0:
-                return
-
             bounds = self.video_ranges.get(self.path)
-            start_sec = bounds.get("start", 0) if bounds else 0
-            end_sec = bounds.get("end", duration) if bounds else duration
-            start_frame = int(start_sec * fps)
-            end_frame = int(end_sec * fps)
-            step = max((end_frame - start_frame) // FRAMES_PER_THUMBNAIL, 1)
-
-            if (FLUEND):
-                step =FLUEND_STEPS
-                end_frame=start_frame+FRAMES_PER_THUMBNAIL
-
-
-            frames = []
-            for i in range(start_frame, end_frame, step):
-                cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-                success, frame = cap.read()
-                if not success or frame is None:
-                    continue
-                height, width, _ = frame.shape
-                bytes_per_line = 3 * width
-                qimage = QImage(frame.data, width, height, bytes_per_line, QImage.Format_RGB888).rgbSwapped()
-                pixmap = QPixmap.fromImage(qimage)
-                scaled = pixmap.scaledToWidth(self.thumb_size, Qt.SmoothTransformation)
-                frames.append(scaled)
-            cap.release()
-            if frames:
-                self.signal.finished.emit(self.path, frames)
+
+            # Gleicher Inhalt unter anderem Namen (kopiert, verschoben, umbenannt) bereits im Cache?
+            key = self.disk_cache.resolve(self.path, bounds)
+            if self.disk_cache.has_key(key, self.thumb_size):
+                blobs = self.disk_cache.load(key)
+                if blobs:
+                    self.signal.finished.emit(self.path, blobs)
+                    return
+
+            blobs = self.produce(bounds)
+            # Abgebrochen: unvollständige Frames weder anzeigen noch cachen
+            if blobs and not self.token.cancelled:
+                # Nur JPEG-Bytes verlassen den Worker, QPixmaps entstehen erst bei der Anzeige
+                self.signal.finished.emit(self.path, blobs)
+                self.cache_writer.submit(self.path, blobs, self.thumb_size)
         except Exception as e:
-            print(f"Fehler bei Video-Vorschauloop: {e}")
\ No newline at end of file
+            print(f"Fehler bei Video-Vorschauloop: {e}")
+
+    def produce(self, bounds):
+        # Kodieren im Worker-Thread, Schreiben übernimmt der CacheWriter
+        return [encode_frame(f) for f in generate_video_frames(self.path, self.thumb_size, bounds, self.token)]
+
+
+class ProcessThumbnailLoader(VideoThumbnailLoader):
+    # Dekodieren in einem Prozess des Pools; der Thread wartet nur auf das Ergebnis,
+    # damit Cache-Auflösung und ThumbnailSignal.finished unverändert bleiben.
+    def __init__(self, path, thumb_size, signal, video_ranges, disk_cache, cache_writer, process_pool, token=None):
+        super().__init__(path, thumb_size, signal, video_ranges, disk_cache, cache_writer, token)
+        self.process_pool = process_pool
+
+    def produce(self, bounds):
+        future = self.process_pool.submit(generate_encoded_frames, self.path, self.thumb_size, bounds)
+        while True:
+            try:
+                blobs = future.result(timeout=0.1)
+                break
+            except TimeoutError:
+                # Der Kindprozess sieht das Token nicht; abbrechen lässt sich nur, was noch nicht läuft.
+                # Ein bereits laufender Prozess rechnet zu Ende, der Thread wird aber sofort frei.
+                if self.token.cancelled:
+                    future.cancel()
+                    return []
+        return blobs